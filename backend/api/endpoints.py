@@ -4,11 +4,19 @@ Follows FastAPI patterns with Pydantic models and development fixtures.
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Optional, Sequence, Tuple
+from functools import lru_cache
+from collections import defaultdict
+from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from itertools import islice
+import base64
+import binascii
 import json
 import os
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +26,9 @@ api_router = APIRouter(prefix="/api")
 
 # Pydantic models
 class Prediction(BaseModel):
+    # Cached rows are shared across requests, so instances are immutable
+    model_config = ConfigDict(frozen=True)
+
     id: str
     symbol: str
     time: str  # ISO timestamp
@@ -33,6 +44,8 @@ class PredictionsResponse(BaseModel):
     total: Optional[int] = None
 
 class SentimentData(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     symbol: str
     score: float  # -1..1
     window: str
@@ -45,70 +58,79 @@ class SentimentResponse(BaseModel):
     hasMore: bool = False
     total: Optional[int] = None
 
+# Fixture data - embedded for Docker compatibility. Built and validated once at
+# import time so request handlers only reference the cached model instances.
+_PREDICTIONS_FIXTURE: Tuple[Prediction, ...] = tuple(Prediction(**d) for d in [
+    {
+        "id": "pred_001",
+        "symbol": "AAPL",
+        "time": "2025-09-28T14:30:00Z",
+        "values": [175.25, 176.10, 177.80, 179.20, 180.15],
+        "horizon": 5,
+        "model": "N-BEATS",
+        "confidence": 0.87
+    },
+    {
+        "id": "pred_002", 
+        "symbol": "MSFT",
+        "time": "2025-09-28T14:30:00Z",
+        "values": [331.45, 332.80, 334.20, 335.90, 337.25],
+        "horizon": 5,
+        "model": "LSTM",
+        "confidence": 0.82
+    },
+    {
+        "id": "pred_003",
+        "symbol": "GOOGL", 
+        "time": "2025-09-28T14:30:00Z",
+        "values": [139.80, 140.50, 141.25, 142.10, 143.00],
+        "horizon": 5,
+        "model": "N-BEATS",
+        "confidence": 0.91
+    }
+])
+
+_SENTIMENT_FIXTURE: Tuple[SentimentData, ...] = tuple(SentimentData(**d) for d in [
+    {
+        "symbol": "AAPL",
+        "score": 0.65,
+        "window": "1h",
+        "timestamp": "2025-09-28T14:30:00Z",
+        "sources": ["Reuters", "Bloomberg", "WSJ"]
+    },
+    {
+        "symbol": "MSFT", 
+        "score": -0.12,
+        "window": "1h",
+        "timestamp": "2025-09-28T14:30:00Z",
+        "sources": ["CNBC", "Financial Times"]
+    },
+    {
+        "symbol": "GOOGL",
+        "score": 0.38,
+        "window": "1h", 
+        "timestamp": "2025-09-28T14:30:00Z",
+        "sources": ["Bloomberg", "MarketWatch"]
+    }
+])
+
 # Helper functions to load fixture data
-def load_fixture(filename: str) -> List[dict]:
-    """Load fixture data - embedded for Docker compatibility."""
+def load_fixture(filename: str) -> Tuple[BaseModel, ...]:
+    """Return the cached fixture models for ``filename``."""
     if filename == 'predictions.json':
-        return [
-            {
-                "id": "pred_001",
-                "symbol": "AAPL",
-                "time": "2025-09-28T14:30:00Z",
-                "values": [175.25, 176.10, 177.80, 179.20, 180.15],
-                "horizon": 5,
-                "model": "N-BEATS",
-                "confidence": 0.87
-            },
-            {
-                "id": "pred_002", 
-                "symbol": "MSFT",
-                "time": "2025-09-28T14:30:00Z",
-                "values": [331.45, 332.80, 334.20, 335.90, 337.25],
-                "horizon": 5,
-                "model": "LSTM",
-                "confidence": 0.82
-            },
-            {
-                "id": "pred_003",
-                "symbol": "GOOGL", 
-                "time": "2025-09-28T14:30:00Z",
-                "values": [139.80, 140.50, 141.25, 142.10, 143.00],
-                "horizon": 5,
-                "model": "N-BEATS",
-                "confidence": 0.91
-            }
-        ]
+        return _PREDICTIONS_FIXTURE
     elif filename == 'sentiment.json':
-        return [
-            {
-                "symbol": "AAPL",
-                "score": 0.65,
-                "window": "1h",
-                "timestamp": "2025-09-28T14:30:00Z",
-                "sources": ["Reuters", "Bloomberg", "WSJ"]
-            },
-            {
-                "symbol": "MSFT", 
-                "score": -0.12,
-                "window": "1h",
-                "timestamp": "2025-09-28T14:30:00Z",
-                "sources": ["CNBC", "Financial Times"]
-            },
-            {
-                "symbol": "GOOGL",
-                "score": 0.38,
-                "window": "1h", 
-                "timestamp": "2025-09-28T14:30:00Z",
-                "sources": ["Bloomberg", "MarketWatch"]
-            }
-        ]
-    return []
+        return _SENTIMENT_FIXTURE
+    return ()
 
 def generate_realtime_predictions() -> List[dict]:
     """Generate some real-time prediction data for demo purposes."""
     symbols = ["AAPL", "MSFT", "GOOGL", "TSLA", "NVDA", "META"]
     models = ["N-BEATS", "LSTM", "Transformer"]
     
+    # One timestamp for the whole batch
+    now_iso = datetime.now(timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+    
     predictions = []
     for i, symbol in enumerate(symbols):
         base_price = 100 + (i * 50)  # Vary base prices
@@ -117,7 +139,7 @@ def generate_realtime_predictions() -> List[dict]:
         predictions.append({
             "id": f"rt_pred_{i}",
             "symbol": symbol,
-            "time": datetime.utcnow().isoformat() + "Z",
+            "time": now_iso,
             "values": values,
             "horizon": 5,
             "model": models[i % len(models)],
@@ -136,6 +158,9 @@ def generate_realtime_sentiment() -> List[dict]:
         ["Bloomberg", "Reuters", "WSJ"]
     ]
     
+    # One timestamp for the whole batch
+    now_iso = datetime.now(timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+    
     sentiment_data = []
     for i, symbol in enumerate(symbols):
         # Generate sentiment between -0.8 and 0.8
@@ -146,12 +171,170 @@ def generate_realtime_sentiment() -> List[dict]:
             "symbol": symbol,
             "score": score,
             "window": "1h",
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": now_iso,
             "sources": sources_options[i % len(sources_options)]
         })
     
     return sentiment_data
 
+# Real-time rows are regenerated at most once per second; bursts of requests
+# within the same second share one snapshot. The generators emit rows that
+# already conform to the models, so validation is skipped via model_construct.
+@lru_cache(maxsize=1)
+def _realtime_predictions(second: int) -> Tuple[Prediction, ...]:
+    return tuple(Prediction.model_construct(**p) for p in generate_realtime_predictions())
+
+@lru_cache(maxsize=1)
+def _realtime_sentiment(second: int) -> Tuple[SentimentData, ...]:
+    return tuple(SentimentData.model_construct(**s) for s in generate_realtime_sentiment())
+
+# Keyset pagination: rows are kept sorted by their natural order key so a
+# cursor (the last key of the previous page) resumes with a bisect instead of
+# re-walking an offset prefix.
+def _prediction_key(p: Prediction) -> Tuple[str, str]:
+    return (p.time, p.id)
+
+def _sentiment_key(s: SentimentData) -> Tuple[str, str]:
+    return (s.timestamp, s.symbol)
+
+def _sorted_predictions(second: int) -> Tuple[Prediction, ...]:
+    rows = load_fixture('predictions.json') + _realtime_predictions(second)
+    return tuple(sorted(rows, key=_prediction_key))
+
+def _sorted_sentiment(second: int) -> Tuple[SentimentData, ...]:
+    # Combine fixture and real-time data, preferring fixture data
+    fixture_data = load_fixture('sentiment.json')
+    fixture_symbols = {f.symbol for f in fixture_data}
+    rows = fixture_data + tuple(rt for rt in _realtime_sentiment(second) if rt.symbol not in fixture_symbols)
+    return tuple(sorted(rows, key=_sentiment_key))
+
+def _postings(rows, attr: str) -> Dict[str, List[int]]:
+    """Map each value of ``attr`` to the (ascending) positions of its rows."""
+    index: Dict[str, List[int]] = defaultdict(list)
+    for i, row in enumerate(rows):
+        value = getattr(row, attr)
+        if value is not None:
+            index[value].append(i)
+    return dict(index)
+
+def _candidates(n_rows: int, *postings: Optional[Sequence[int]]) -> Sequence[int]:
+    """Most selective posting list among the active filters (all rows if none)."""
+    active = [p for p in postings if p is not None]
+    if not active:
+        return range(n_rows)
+    return min(active, key=len)
+
+@dataclass(frozen=True)
+class PredictionIndex:
+    """Snapshot of predictions in key order with exact-match secondary indexes."""
+    rows: Tuple[Prediction, ...]
+    by_symbol: Dict[str, List[int]]
+    by_model: Dict[str, List[int]]
+    by_id: Dict[str, Prediction]
+
+    def candidates(self, symbol: Optional[str], model: Optional[str]) -> Sequence[int]:
+        return _candidates(
+            len(self.rows),
+            self.by_symbol.get(symbol, []) if symbol else None,
+            self.by_model.get(model, []) if model else None,
+        )
+
+@dataclass(frozen=True)
+class SentimentIndex:
+    """Snapshot of sentiment rows in key order with exact-match secondary indexes."""
+    rows: Tuple[SentimentData, ...]
+    by_symbol: Dict[str, List[int]]
+    by_window: Dict[str, List[int]]
+
+    def candidates(self, symbol: Optional[str], window: Optional[str]) -> Sequence[int]:
+        return _candidates(
+            len(self.rows),
+            self.by_symbol.get(symbol, []) if symbol else None,
+            self.by_window.get(window, []) if window else None,
+        )
+
+# Indexes are rebuilt in one pass whenever the real-time snapshot refreshes
+@lru_cache(maxsize=1)
+def _prediction_index(second: int) -> PredictionIndex:
+    rows = _sorted_predictions(second)
+    return PredictionIndex(rows, _postings(rows, 'symbol'), _postings(rows, 'model'),
+                           {p.id: p for p in rows})
+
+@lru_cache(maxsize=1)
+def _sentiment_index(second: int) -> SentimentIndex:
+    rows = _sorted_sentiment(second)
+    return SentimentIndex(rows, _postings(rows, 'symbol'), _postings(rows, 'window'))
+
+@lru_cache(maxsize=1)
+def _sentiment_by_symbol(second: int) -> Dict[str, List[SentimentData]]:
+    """Fixture and real-time entries per symbol (both kept, fixture first)."""
+    by_symbol: Dict[str, List[SentimentData]] = defaultdict(list)
+    for s in load_fixture('sentiment.json') + _realtime_sentiment(second):
+        by_symbol[s.symbol].append(s)
+    return dict(by_symbol)
+
+def _scan(rows, positions: Sequence[int], start_idx: int):
+    """Yield rows at ``positions`` from ``start_idx`` onwards."""
+    return (rows[i] for i in islice(positions, bisect_left(positions, start_idx), None))
+
+@lru_cache(maxsize=64)
+def _filtered_predictions(second: int, symbol: Optional[str], model: Optional[str],
+                          since: Optional[str], horizon: Optional[int]) -> Tuple[Prediction, ...]:
+    """All predictions matching the filters, in key order (cached per snapshot)."""
+    idx = _prediction_index(second)
+    # ``since`` is applied by the start index; start from the most selective
+    # posting list and fuse the remaining filters
+    start_idx = _page_start(idx.rows, _prediction_key, since, None)
+    preds = []
+    if symbol:
+        preds.append(lambda p: p.symbol == symbol)
+    if model:
+        preds.append(lambda p: p.model == model)
+    if horizon:
+        preds.append(lambda p: p.horizon == horizon)
+    return tuple(p for p in _scan(idx.rows, idx.candidates(symbol, model), start_idx)
+                 if all(f(p) for f in preds))
+
+@lru_cache(maxsize=64)
+def _filtered_sentiment(second: int, symbol: Optional[str], window: Optional[str],
+                        sources: Optional[str], since: Optional[str]) -> Tuple[SentimentData, ...]:
+    """All sentiment rows matching the filters, in key order (cached per snapshot)."""
+    idx = _sentiment_index(second)
+    # ``since`` is applied by the start index; fuse the remaining filters
+    start_idx = _page_start(idx.rows, _sentiment_key, since, None)
+    preds = []
+    if symbol:
+        preds.append(lambda s: s.symbol == symbol)
+    if window:
+        preds.append(lambda s: s.window == window)
+    if sources:
+        source_set = {src.strip() for src in sources.split(',')}
+        preds.append(lambda s: bool(s.sources) and not source_set.isdisjoint(s.sources))
+    return tuple(s for s in _scan(idx.rows, idx.candidates(symbol, window), start_idx)
+                 if all(f(s) for f in preds))
+
+def _encode_cursor(key: Tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode('|'.join(key).encode()).decode()
+
+def _decode_cursor(cursor: str) -> Optional[Tuple[str, str]]:
+    """Decode a cursor into its ``(sort value, id)`` key; None if malformed."""
+    try:
+        last_value, sep, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition('|')
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    return (last_value, last_id) if sep else None
+
+def _page_start(rows, key, since: Optional[str], cursor: Optional[str]) -> int:
+    """Index of the first row after ``cursor`` whose sort value is >= ``since``."""
+    start_idx = 0
+    if since:
+        start_idx = bisect_left(rows, (since,), key=key)
+    if cursor:
+        last_key = _decode_cursor(cursor)
+        if last_key is not None:
+            start_idx = max(start_idx, bisect_right(rows, last_key, key=key))
+    return start_idx
+
 # API Endpoints
 @api_router.get("/predictions", response_model=PredictionsResponse)
 async def get_predictions(
@@ -166,50 +349,21 @@ async def get_predictions(
     Get model predictions with optional filtering and pagination.
     """
     try:
-        # Try to load fixture data first, then supplement with real-time data
-        fixture_data = load_fixture('predictions.json')
-        realtime_data = generate_realtime_predictions()
-        
-        # Combine fixture and real-time data
-        all_predictions = fixture_data + realtime_data
-        
-        # Apply filters
-        filtered_predictions = all_predictions.copy()
-        
-        if symbol:
-            filtered_predictions = [p for p in filtered_predictions if p.get('symbol') == symbol]
-        
-        if model:
-            filtered_predictions = [p for p in filtered_predictions if p.get('model') == model]
-        
-        if since:
-            # Simple timestamp filtering (in production, use proper datetime parsing)
-            filtered_predictions = [p for p in filtered_predictions if p.get('time', '') >= since]
-        
-        if horizon:
-            filtered_predictions = [p for p in filtered_predictions if p.get('horizon') == horizon]
+        # Repeat queries within a snapshot reuse the cached filtered rows
+        rows = _filtered_predictions(int(time.time()), symbol, model, since, horizon)
+        start_idx = _page_start(rows, _prediction_key, None, cursor)
         
-        # Simple pagination (in production, implement proper cursor-based pagination)
-        start_idx = 0
-        if cursor:
-            try:
-                start_idx = int(cursor)
-            except ValueError:
-                pass
-        
-        end_idx = start_idx + limit
-        page_predictions = filtered_predictions[start_idx:end_idx]
-        has_more = end_idx < len(filtered_predictions)
-        next_cursor = str(end_idx) if has_more else None
-        
-        # Convert to Pydantic models
-        predictions = [Prediction(**pred) for pred in page_predictions]
+        # Fetch one extra row to detect whether another page exists
+        page_predictions = list(rows[start_idx:start_idx + limit + 1])
+        has_more = len(page_predictions) > limit
+        del page_predictions[limit:]
+        next_cursor = _encode_cursor(_prediction_key(page_predictions[-1])) if has_more else None
         
         return PredictionsResponse(
-            predictions=predictions,
+            predictions=page_predictions,
             nextCursor=next_cursor,
             hasMore=has_more,
-            total=len(filtered_predictions)
+            total=len(rows)
         )
         
     except Exception as e:
@@ -222,15 +376,11 @@ async def get_prediction_by_id(prediction_id: str):
     Get a specific prediction by ID.
     """
     try:
-        fixture_data = load_fixture('predictions.json')
-        realtime_data = generate_realtime_predictions()
-        all_predictions = fixture_data + realtime_data
-        
-        prediction_data = next((p for p in all_predictions if p.get('id') == prediction_id), None)
-        if not prediction_data:
+        prediction = _prediction_index(int(time.time())).by_id.get(prediction_id)
+        if prediction is None:
             raise HTTPException(status_code=404, detail="Prediction not found")
         
-        return Prediction(**prediction_data)
+        return prediction
         
     except HTTPException:
         raise
@@ -251,52 +401,21 @@ async def get_sentiment(
     Get sentiment analysis data with optional filtering and pagination.
     """
     try:
-        # Try to load fixture data first, then supplement with real-time data
-        fixture_data = load_fixture('sentiment.json')
-        realtime_data = generate_realtime_sentiment()
-        
-        # Combine fixture and real-time data, preferring fixture data
-        all_sentiment = fixture_data + [rt for rt in realtime_data 
-                                      if not any(f.get('symbol') == rt['symbol'] for f in fixture_data)]
-        
-        # Apply filters
-        filtered_sentiment = all_sentiment.copy()
-        
-        if symbol:
-            filtered_sentiment = [s for s in filtered_sentiment if s.get('symbol') == symbol]
+        # Repeat queries within a snapshot reuse the cached filtered rows
+        rows = _filtered_sentiment(int(time.time()), symbol, window, sources, since)
+        start_idx = _page_start(rows, _sentiment_key, None, cursor)
         
-        if window:
-            filtered_sentiment = [s for s in filtered_sentiment if s.get('window') == window]
-        
-        if sources:
-            source_list = [s.strip() for s in sources.split(',')]
-            filtered_sentiment = [s for s in filtered_sentiment 
-                                if s.get('sources') and any(src in s['sources'] for src in source_list)]
-        
-        if since:
-            filtered_sentiment = [s for s in filtered_sentiment if s.get('timestamp', '') >= since]
-        
-        # Simple pagination
-        start_idx = 0
-        if cursor:
-            try:
-                start_idx = int(cursor)
-            except ValueError:
-                pass
-        
-        end_idx = start_idx + limit
-        page_sentiment = filtered_sentiment[start_idx:end_idx]
-        has_more = end_idx < len(filtered_sentiment)
-        next_cursor = str(end_idx) if has_more else None
-        
-        # Convert to Pydantic models
-        sentiment_data = [SentimentData(**sent) for sent in page_sentiment]
+        # Fetch one extra row to detect whether another page exists
+        page_sentiment = list(rows[start_idx:start_idx + limit + 1])
+        has_more = len(page_sentiment) > limit
+        del page_sentiment[limit:]
+        next_cursor = _encode_cursor(_sentiment_key(page_sentiment[-1])) if has_more else None
         
         return SentimentResponse(
-            sentiment=sentiment_data,
+            sentiment=page_sentiment,
             nextCursor=next_cursor,
             hasMore=has_more,
-            total=len(filtered_sentiment)
+            total=len(rows)
         )
         
     except Exception as e:
@@ -309,16 +428,12 @@ async def get_sentiment_by_symbol(symbol: str):
     Get sentiment data for a specific symbol.
     """
     try:
-        fixture_data = load_fixture('sentiment.json')
-        realtime_data = generate_realtime_sentiment()
-        all_sentiment = fixture_data + realtime_data
-        
-        symbol_sentiment = [s for s in all_sentiment if s.get('symbol') == symbol]
+        symbol_sentiment = _sentiment_by_symbol(int(time.time())).get(symbol)
         
         if not symbol_sentiment:
             raise HTTPException(status_code=404, detail=f"No sentiment data found for symbol {symbol}")
         
-        return [SentimentData(**sent) for sent in symbol_sentiment]
+        return symbol_sentiment
         
     except HTTPException:
         raise
@@ -1,21 +1,58 @@
 from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any
+import asyncio
 import httpx
 import os
 from datetime import datetime
 from typing import Optional
-import re
 
 router = APIRouter(prefix="/api")
 
+# Prometheus metrics surfaced by /components/{id}/metrics.
+_WANTED_METRICS = ("process_resident_memory_bytes", "process_cpu_seconds_total", "http_requests_total")
 
-async def _probe(url: str, timeout: float = 2.0) -> Dict[str, Any]:
+# Shared client so probes reuse keep-alive connections instead of paying a new
+# TCP handshake per request. Created on app startup (or lazily on first use).
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=2.0, limits=httpx.Limits(max_keepalive_connections=32))
+    return _client
+
+
+async def start_client() -> None:
+    _get_client()
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _scan_metric_line(line: str, parsed: Dict[str, Optional[float]], wanted: set) -> None:
+    """Record ``line``'s sample in ``parsed`` if it is an unlabelled wanted metric."""
+    name, _, rest = line.partition(' ')
+    if name not in wanted:
+        return
     try:
-        async with httpx.AsyncClient(timeout=timeout) as c:
-            r = await c.get(url)
-            r.raise_for_status()
-            data = r.json() if r.text else {}
-            return {"ok": True, "details": data}
+        parsed[name] = float(rest.split()[0])
+    except (IndexError, ValueError):
+        return
+    wanted.discard(name)
+
+
+async def _probe(url: str, timeout: float = 2.0, client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
+    try:
+        c = client or _get_client()
+        r = await c.get(url, timeout=timeout)
+        r.raise_for_status()
+        data = r.json() if r.text else {}
+        return {"ok": True, "details": data}
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
@@ -46,11 +83,16 @@ async def get_system_status() -> Dict[str, Any]:
     }
 
     components: List[Dict[str, Any]] = []
-    # Probe each service and normalize component ids expected by the frontend.
+    # Probe all services concurrently so the snapshot costs max(timeout), not sum.
+    probe_urls = [(comp, f"http://{host}/health") for comp, host in services.items()]
+    client = _get_client()
+    results = await asyncio.gather(*[_probe(url, client=client) for _, url in probe_urls], return_exceptions=True)
+
+    # Normalize component ids expected by the frontend.
     finbert_found: Optional[Dict[str, Any]] = None
-    for comp, host in services.items():
-        probe_url = f"http://{host}/health"
-        result = await _probe(probe_url)
+    for (comp, _), result in zip(probe_urls, results):
+        if isinstance(result, BaseException):
+            result = {"ok": False, "error": str(result)}
 
         # Special handling: merge finbert candidates into a single frontend component
         if comp.startswith("finbert_server_"):
@@ -106,11 +148,17 @@ async def get_component_metrics(component_id: str):
         return {"component": component_id, "metrics": {}, "timestamp": datetime.utcnow().isoformat() + "Z"}
 
     metrics_url = f"http://{host}/metrics"
+    # Parse a few Prometheus-style metrics while streaming the body (not a full
+    # parser); stop reading as soon as every wanted metric has been seen.
+    parsed: Dict[str, Optional[float]] = dict.fromkeys(_WANTED_METRICS)
+    wanted = set(_WANTED_METRICS)
     try:
-        async with httpx.AsyncClient(timeout=3.0) as c:
-            r = await c.get(metrics_url)
+        async with _get_client().stream("GET", metrics_url, timeout=3.0) as r:
             r.raise_for_status()
-            text = r.text
+            async for line in r.aiter_lines():
+                _scan_metric_line(line, parsed, wanted)
+                if not wanted:
+                    break
     except Exception:
         # metrics endpoint not available — fall back to health probe details (if available)
         health = await _probe(f"http://{host}/health")
@@ -121,22 +169,6 @@ async def get_component_metrics(component_id: str):
         }
         return {"component": component_id, "metrics": fallback_metrics, "timestamp": datetime.utcnow().isoformat() + "Z"}
 
-    # Parse a few Prometheus-style metrics from the text body (simple regex; not a full parser)
-    def _extract_metric(name: str) -> Optional[float]:
-        m = re.search(rf"^{re.escape(name)}\s+([0-9]+(?:\.[0-9]+)?)$", text, flags=re.M)
-        if m:
-            try:
-                return float(m.group(1))
-            except Exception:
-                return None
-        return None
-
-    parsed = {
-        "process_resident_memory_bytes": _extract_metric("process_resident_memory_bytes"),
-        "process_cpu_seconds_total": _extract_metric("process_cpu_seconds_total"),
-        "http_requests_total": _extract_metric("http_requests_total"),
-    }
-
     # Return parsed metrics with timestamp
     return {"component": component_id, "metrics": parsed, "timestamp": datetime.utcnow().isoformat() + "Z"}
 
@@ -1,18 +1,20 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import asyncio
 import logging
-from typing import Set
+import zlib
+import orjson
+from typing import Optional, Set
 from fastapi import WebSocket
-from .ws_broadcaster import broadcaster
+from .ws_broadcaster import broadcaster, PRECOMPRESS, PRECOMPRESS_LEVEL
 from .api.endpoints import api_router
-from .api.health import router as health_router
+from .api.health import router as health_router, start_client, close_client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("backend.main")
 
-app = FastAPI(title="AITrader Main API")
+app = FastAPI(title="AITrader Main API", default_response_class=ORJSONResponse)
 
 # Dev-friendly CORS
 app.add_middleware(
@@ -29,32 +31,48 @@ app.include_router(health_router)
 # Connected WebSocket clients are managed by ws_broadcaster
 _clients: Set[WebSocket] = set()
 
+# The heartbeat never changes, so serialize it once instead of per client/tick
+_HEARTBEAT = orjson.dumps({"type": "system_status", "data": {"ok": True}})
+_HEARTBEAT_DEFLATE = zlib.compress(_HEARTBEAT, PRECOMPRESS_LEVEL)
+_heartbeat_task: Optional[asyncio.Task] = None
 
 
-async def _safe_send(ws: WebSocket, payload: dict):
+async def _safe_send(ws: WebSocket, data: bytes):
     try:
-        await ws.send_json(payload)
+        await ws.send_bytes(data)
     except Exception:
         # If send fails, ensure removal elsewhere
         logger.exception("failed to send to client")
 
 
+async def _heartbeat_loop(interval: float = 1.0):
+    """Single producer that sends the system_status heartbeat to every client."""
+    while True:
+        await asyncio.sleep(interval)
+        await broadcaster.broadcast_bytes(_HEARTBEAT)
+
+
 @app.websocket("/api/ws/monitor")
 async def ws_monitor(websocket: WebSocket):
     """WebSocket endpoint for realtime monitor.
 
-    Sends periodic system_status messages. In production this should subscribe to
-    Redis Streams or another event bus and forward events to connected clients.
+    Heartbeats are sent by the shared _heartbeat_loop; this handler only registers
+    the client and waits for it to disconnect. In production the broadcaster should
+    subscribe to Redis Streams or another event bus and forward events to clients.
     """
     await websocket.accept()
-    await broadcaster.add_client(websocket)
+    # opt-in pre-compressed frames (see WS_PRECOMPRESS in ws_broadcaster)
+    compressed = PRECOMPRESS and websocket.query_params.get("compress") == "deflate"
+    await broadcaster.add_client(websocket, compressed=compressed)
     logger.info(f"client connected")
     try:
+        # Send one heartbeat right away so the UI doesn't wait for the next tick
+        await _safe_send(websocket, _HEARTBEAT_DEFLATE if compressed else _HEARTBEAT)
         while True:
-            payload = {"type": "system_status", "data": {"ok": True}}
-            await _safe_send(websocket, payload)
-            # If client sends anything, we won't block on receive here; just heartbeat
-            await asyncio.sleep(1)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+        logger.info("client disconnected")
     except WebSocketDisconnect:
         logger.info("client disconnected")
     finally:
@@ -66,7 +84,7 @@ async def broadcast(request: Request):
     """Broadcast the posted JSON payload to all connected WS clients (dev helper)."""
     payload = await request.json()
     await broadcaster.broadcast_json(payload)
-    return JSONResponse({"sent": len(list(broadcaster._clients))})
+    return ORJSONResponse({"sent": broadcaster.client_count})
 
 
 @app.get("/health")
@@ -76,6 +94,26 @@ async def health():
 
 @app.on_event('startup')
 async def on_startup():
+    # shared HTTP client for health/metrics probes
+    await start_client()
     # start broadcaster background task (redis listener)
     await broadcaster.start()
+    # one heartbeat producer for all monitor clients
+    global _heartbeat_task
+    if _heartbeat_task is None:
+        _heartbeat_task = asyncio.create_task(_heartbeat_loop())
+
+
+@app.on_event('shutdown')
+async def on_shutdown():
+    global _heartbeat_task
+    if _heartbeat_task is not None:
+        _heartbeat_task.cancel()
+        try:
+            await _heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        _heartbeat_task = None
+    await broadcaster.stop()
+    await close_client()
 
@@ -6,12 +6,13 @@ Copilot:
 from fastapi import FastAPI
 from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import logging
 from pydantic import BaseModel
 from typing import List, Optional
 import asyncio
 
-app = FastAPI(title="Settings Service")
+app = FastAPI(title="Settings Service", default_response_class=ORJSONResponse)
 
 # Allow all origins for dev so websocket handshakes aren't rejected due to origin checks.
 app.add_middleware(
@@ -31,12 +32,13 @@ class ScopeLoggerMiddleware:
         self.app = app
 
     async def __call__(self, scope, receive, send):
-        try:
-            if scope.get('type') == 'websocket':
+        # Only websocket handshakes are logged; plain HTTP requests skip all header work
+        if scope.get('type') == 'websocket' and logger.isEnabledFor(logging.INFO):
+            try:
                 headers = {k.decode(): v.decode() for k, v in scope.get('headers', [])}
                 logger.info(f"ASGI websocket scope: path={scope.get('path')} headers={headers}")
-        except Exception:
-            logger.exception('failed logging scope')
+            except Exception:
+                logger.exception('failed logging scope')
         await self.app(scope, receive, send)
 
 
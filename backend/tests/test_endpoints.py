@@ -0,0 +1,57 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api import endpoints
+from backend.main import app
+
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _frozen_snapshot(monkeypatch):
+    # Pin the real-time snapshot so a second boundary can't reshuffle pages mid-walk.
+    monkeypatch.setattr(endpoints.time, 'time', lambda: 1_700_000_000.0)
+
+
+def _walk(path: str, items_key: str, **params):
+    """Follow nextCursor until exhausted and return every page's items."""
+    pages = []
+    cursor = None
+    while True:
+        query = dict(params)
+        if cursor:
+            query['cursor'] = cursor
+        body = client.get(path, params=query).json()
+        pages.append(body[items_key])
+        if not body['hasMore']:
+            assert body['nextCursor'] is None
+            return pages
+        cursor = body['nextCursor']
+
+
+def test_predictions_keyset_pages_cover_all_rows_once():
+    full = client.get('/api/predictions', params={'limit': 100}).json()['predictions']
+    pages = _walk('/api/predictions', 'predictions', limit=2)
+    assert all(len(p) <= 2 for p in pages)
+    assert [p['id'] for page in pages for p in page] == [p['id'] for p in full]
+
+
+def test_sentiment_keyset_pages_with_filter():
+    full = client.get('/api/sentiment', params={'limit': 100, 'window': '1h'}).json()['sentiment']
+    pages = _walk('/api/sentiment', 'sentiment', limit=3, window='1h')
+    assert [s['symbol'] for page in pages for s in page] == [s['symbol'] for s in full]
+
+
+def test_malformed_cursor_starts_from_first_page():
+    first = client.get('/api/predictions', params={'limit': 2}).json()
+    bad = client.get('/api/predictions', params={'limit': 2, 'cursor': '%%%'}).json()
+    assert [p['id'] for p in bad['predictions']] == [p['id'] for p in first['predictions']]
+
+
+def test_total_counts_filtered_rows_across_pages():
+    preds = _walk('/api/predictions', 'predictions', limit=2)
+    assert client.get('/api/predictions', params={'limit': 2}).json()['total'] == sum(map(len, preds))
+    sent = _walk('/api/sentiment', 'sentiment', limit=3, window='1h')
+    body = client.get('/api/sentiment', params={'limit': 3, 'window': '1h'}).json()
+    assert body['total'] == sum(map(len, sent))
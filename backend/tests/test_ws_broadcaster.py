@@ -0,0 +1,114 @@
+import asyncio
+
+from backend.ws_broadcaster import WSBroadcaster
+
+
+class FakeWS:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+
+    async def send_bytes(self, data):
+        if self.fail:
+            raise RuntimeError('socket closed')
+        self.sent.append(data)
+
+
+def test_broadcast_reaches_clients_and_drops_dead_ones():
+    async def run():
+        b = WSBroadcaster()
+        good, dead = FakeWS(), FakeWS(fail=True)
+        await b.add_client(good)
+        await b.add_client(dead)
+        await b.broadcast_json({'type': 'signal', 'v': 1})
+        # let the per-client writer tasks drain their queues
+        await asyncio.sleep(0.01)
+        return b, good
+
+    b, good = asyncio.run(run())
+    assert good.sent == [b'{"type":"signal","v":1}']
+    assert b.client_count == 1
+
+
+def test_slow_client_queue_drops_oldest(monkeypatch):
+    monkeypatch.setattr('backend.ws_broadcaster.CLIENT_QUEUE_SIZE', 2)
+
+    async def run():
+        b = WSBroadcaster()
+        ws = FakeWS()
+        await b.add_client(ws)
+        # enqueue without yielding so the writer can't drain in between
+        for i in range(4):
+            await b.broadcast_text(str(i))
+        await asyncio.sleep(0.01)
+        return ws
+
+    assert asyncio.run(run()).sent == [b'2', b'3']
+
+
+def _run_with_pubsub(messages):
+    """Feed `messages` through WSBroadcaster._run; the first arrives via listen(),
+    the rest are already buffered for get_message()."""
+    class FakePubSub:
+        def __init__(self):
+            self.buffered = list(messages[1:])
+
+        async def subscribe(self, channel):
+            pass
+
+        async def listen(self):
+            yield {'type': 'subscribe', 'data': 1}
+            yield {'type': 'message', 'data': messages[0]}
+            await asyncio.Event().wait()
+
+        async def get_message(self, ignore_subscribe_messages=False, timeout=0):
+            if not self.buffered:
+                return None
+            return {'type': 'message', 'data': self.buffered.pop(0)}
+
+    class FakeRedis:
+        def pubsub(self):
+            return FakePubSub()
+
+    class FakeAioredis:
+        @staticmethod
+        async def from_url(url):
+            return FakeRedis()
+
+    async def run():
+        b = WSBroadcaster()
+        b._aioredis = FakeAioredis
+        ws = FakeWS()
+        await b.add_client(ws)
+        task = asyncio.create_task(b._run())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        return ws
+
+    return asyncio.run(run()).sent
+
+
+def test_pubsub_bytes_are_forwarded_unchanged():
+    assert _run_with_pubsub([b'{"type":"signal"}']) == [b'{"type":"signal"}']
+
+
+def test_pubsub_backlog_is_merged_into_one_frame():
+    sent = _run_with_pubsub([b'{"v":1}', b'{"v":2}', '{"v":3}'])
+    assert sent == [b'{"type":"multi","events":[{"v":1},{"v":2},{"v":3}]}']
+
+
+def test_deflate_clients_share_one_compressed_payload():
+    import zlib
+
+    async def run():
+        b = WSBroadcaster()
+        plain, packed = FakeWS(), FakeWS()
+        await b.add_client(plain)
+        await b.add_client(packed, compressed=True)
+        await b.broadcast_json({'type': 'signal', 'v': 1})
+        await asyncio.sleep(0.01)
+        return plain, packed
+
+    plain, packed = asyncio.run(run())
+    assert plain.sent == [b'{"type":"signal","v":1}']
+    assert [zlib.decompress(m) for m in packed.sent] == plain.sent
@@ -1,16 +1,45 @@
 import os
 import asyncio
 import logging
-from typing import Set
+import zlib
+from typing import Dict, Set, Tuple
 
+import orjson
 from fastapi import WebSocket
 
 logger = logging.getLogger("ws_broadcaster")
 
+# Each client gets a bounded outbound queue drained by its own writer task, so
+# a slow peer only backs up (and eventually drops) its own messages.
+SEND_TIMEOUT_SECONDS = float(os.getenv('WS_SEND_TIMEOUT_SECONDS', '5.0'))
+CLIENT_QUEUE_SIZE = int(os.getenv('WS_CLIENT_QUEUE_SIZE', '256'))
+# Pubsub messages already waiting when one arrives are merged into a single
+# {"type":"multi","events":[...]} frame, up to these limits.
+COALESCE_MAX_MESSAGES = int(os.getenv('WS_COALESCE_MAX_MESSAGES', '64'))
+COALESCE_MAX_BYTES = int(os.getenv('WS_COALESCE_MAX_BYTES', str(64 * 1024)))
+# With WS_PRECOMPRESS=1, clients that connect with ?compress=deflate receive
+# zlib-compressed binary frames; each message is compressed once for all of them.
+PRECOMPRESS = os.getenv('WS_PRECOMPRESS', '0') == '1'
+PRECOMPRESS_LEVEL = int(os.getenv('WS_PRECOMPRESS_LEVEL', '6'))
+
+
+def _as_bytes(data) -> bytes:
+    return data if isinstance(data, bytes) else str(data).encode('utf-8')
+
+
+def _multi_frame(parts) -> bytes:
+    # parts are JSON documents already, so the envelope is built by concatenation
+    return b'{"type":"multi","events":[' + b','.join(parts) + b']}'
+
 
 class WSBroadcaster:
     def __init__(self):
-        self._clients: Set[WebSocket] = set()
+        self._clients: Dict[WebSocket, asyncio.Queue] = {}
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
+        self._deflate: Set[WebSocket] = set()
+        # fan-out snapshots, rebuilt only when the client set changes
+        self._queues: Tuple[asyncio.Queue, ...] = ()
+        self._deflate_queues: Tuple[asyncio.Queue, ...] = ()
         self._redis = None
         self._task = None
 
@@ -34,6 +63,8 @@ class WSBroadcaster:
             except asyncio.CancelledError:
                 pass
             self._task = None
+        for ws in list(self._writers):
+            await self.remove_client(ws)
 
     async def _run(self):
         redis_url = os.getenv('REDIS_URL', 'redis://redis:6379/0')
@@ -52,9 +83,20 @@ class WSBroadcaster:
                 async for message in pubsub.listen():
                     if not message or message.get('type') != 'message':
                         continue
-                    data = message.get('data')
-                    text = data.decode() if isinstance(data, bytes) else str(data)
-                    await self.broadcast_text(text)
+                    # forward publisher bytes untouched; only str payloads need encoding
+                    parts = [_as_bytes(message.get('data'))]
+                    size = len(parts[0])
+                    # drain whatever is already buffered without waiting
+                    while len(parts) < COALESCE_MAX_MESSAGES and size < COALESCE_MAX_BYTES:
+                        extra = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0)
+                        if not extra:
+                            break
+                        if extra.get('type') != 'message':
+                            continue
+                        data = _as_bytes(extra.get('data'))
+                        parts.append(data)
+                        size += len(data)
+                    await self.broadcast_bytes(parts[0] if len(parts) == 1 else _multi_frame(parts))
             except asyncio.CancelledError:
                 logger.info('WSBroadcaster cancelled')
                 raise
@@ -66,28 +108,61 @@ class WSBroadcaster:
                     raise
                 backoff = min(backoff * 2, 30)
 
-    async def add_client(self, ws: WebSocket):
-        self._clients.add(ws)
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def _rebuild_snapshots(self):
+        self._queues = tuple(q for ws, q in self._clients.items() if ws not in self._deflate)
+        self._deflate_queues = tuple(q for ws, q in self._clients.items() if ws in self._deflate)
+
+    async def add_client(self, ws: WebSocket, compressed: bool = False):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._clients[ws] = queue
+        if compressed:
+            self._deflate.add(ws)
+        self._rebuild_snapshots()
+        self._writers[ws] = asyncio.create_task(self._writer(ws, queue))
 
     async def remove_client(self, ws: WebSocket):
-        self._clients.discard(ws)
+        if self._clients.pop(ws, None) is not None:
+            self._deflate.discard(ws)
+            self._rebuild_snapshots()
+        writer = self._writers.pop(ws, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+
+    async def _writer(self, ws: WebSocket, queue: asyncio.Queue):
+        try:
+            while True:
+                data = await queue.get()
+                await asyncio.wait_for(ws.send_bytes(data), SEND_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('failed to send to client; removing')
+            await self.remove_client(ws)
 
     async def broadcast_json(self, payload: dict):
-        # send and remove dead clients
-        for c in list(self._clients):
-            try:
-                await c.send_json(payload)
-            except Exception:
-                logger.exception('failed to send_json to client; removing')
-                self._clients.discard(c)
+        # serialize once for all clients; orjson already yields UTF-8 bytes
+        await self.broadcast_bytes(orjson.dumps(payload))
 
     async def broadcast_text(self, text: str):
-        for c in list(self._clients):
-            try:
-                await c.send_text(text)
-            except Exception:
-                logger.exception('failed to send_text to client; removing')
-                self._clients.discard(c)
+        await self.broadcast_bytes(text.encode('utf-8'))
+
+    async def broadcast_bytes(self, data: bytes):
+        # Every client gets the same pre-encoded payload as a binary frame;
+        # enqueue only, never waits on a client socket.
+        self._enqueue(self._queues, data)
+        if self._deflate_queues:
+            self._enqueue(self._deflate_queues, zlib.compress(data, PRECOMPRESS_LEVEL))
 
+    @staticmethod
+    def _enqueue(queues: Tuple[asyncio.Queue, ...], data: bytes):
+        for queue in queues:
+            if queue.full():
+                # drop the oldest message for clients that can't keep up
+                queue.get_nowait()
+            queue.put_nowait(data)
 
 broadcaster = WSBroadcaster()
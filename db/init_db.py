@@ -1,8 +1,13 @@
 # db/init_db.py
 import os
-import psycopg2
 from dotenv import load_dotenv
 
+try:
+    import psycopg  # psycopg 3
+except ImportError:  # legacy environments only ship psycopg2
+    psycopg = None
+    import psycopg2
+
 # Load variables from config/.env
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", "config", ".env"))
 
@@ -13,3 +18,50 @@ DB = dict(
     host=os.getenv("DB_HOST", "localhost"),
     port=os.getenv("DB_PORT", "5432"),
 )
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "schema.sql")
+TABLES_SQL = (
+    "SELECT table_name FROM information_schema.tables "
+    "WHERE table_schema='public' ORDER BY table_name"
+)
+
+
+def run_migration():
+    """Apply schema.sql (idempotent CREATE ... IF NOT EXISTS) and list public tables.
+
+    The DDL is read here rather than at import time, so importing this module
+    never touches the filesystem or the database.
+    """
+    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+        ddl = f.read()
+
+    if psycopg is None:
+        _run_migration_psycopg2(ddl)
+        return
+
+    # psycopg 3 commits and closes on leaving the block (rolls back on error)
+    with psycopg.connect(**DB) as conn, conn.cursor() as cur:
+        # multi-statement DDL can't be a prepared statement
+        cur.execute(ddl, prepare=False)
+        print("Tables in public schema:")
+        # stream rows instead of materializing the whole result
+        for r in cur.stream(TABLES_SQL):
+            print(" -", r[0])
+
+
+def _run_migration_psycopg2(ddl: str):
+    conn = psycopg2.connect(**DB)
+    try:
+        # `with conn` commits on success and rolls back on error; close() is still ours
+        with conn, conn.cursor() as cur:
+            cur.execute(ddl)
+            cur.execute(TABLES_SQL)
+            print("Tables in public schema:")
+            for r in cur.fetchall():
+                print(" -", r[0])
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -1,20 +1,89 @@
-from flask import Flask, request, jsonify
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+import asyncio
 import os
 import logging
-from typing import Optional, Callable, Any
+import threading
+from typing import Optional, Callable, Any, List, Tuple
 
-app = Flask('finbert_server')
+app = FastAPI(title='finbert_server', default_response_class=ORJSONResponse)
 
 # Configuration via environment variables
 MODEL_NAME = os.getenv('MODEL_NAME', 'yiyanghkust/finbert-tone')
 # Honor standard HF cache env vars (HF_HOME / TRANSFORMERS_CACHE) if provided
 CACHE_DIR = os.getenv('HF_HOME') or os.getenv('TRANSFORMERS_CACHE')
-_FINBERT: Optional[Callable[[str], Any]] = None
+_FINBERT: Optional[Callable[..., Any]] = None
+# serializes model loads between the startup warm-up thread and request threads
+_LOAD_LOCK = threading.Lock()
+# Micro-batching: concurrent /predict requests arriving within BATCH_WINDOW_MS
+# share one forward pass of up to MAX_BATCH texts.
+BATCH_WINDOW_MS = float(os.getenv('BATCH_WINDOW_MS', '5'))
+MAX_BATCH = int(os.getenv('MAX_BATCH', '16'))
+MAX_LENGTH = int(os.getenv('MAX_LENGTH', '256'))
+# ~4 chars per token for English news; longer input would be truncated anyway
+MAX_CHARS = int(os.getenv('MAX_CHARS', str(MAX_LENGTH * 4)))
+# 'torch' (fp32, default), 'onnx-int8' (ONNX Runtime dynamic int8, CPU) or
+# 'bnb-int8' (bitsandbytes 8-bit weights, GPU)
+FINBERT_BACKEND = os.getenv('FINBERT_BACKEND', 'torch')
+# torch backend only: fuse attention with BetterTransformer and torch.compile the forward
+FINBERT_OPTIMIZE = os.getenv('FINBERT_OPTIMIZE', '1') == '1'
 
 logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
 logger = logging.getLogger('finbert_server')
 
 
+def _load_onnx_int8():
+    """Export MODEL_NAME to ONNX, quantize it to int8 once and load the result.
+
+    The quantized model is cached under CACHE_DIR (or ~/.cache/finbert) so the
+    export/quantize step only runs on the first start.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    base = CACHE_DIR or os.path.join(os.path.expanduser('~'), '.cache', 'finbert')
+    quant_dir = os.path.join(base, 'onnx-int8', MODEL_NAME.replace('/', '--'))
+    quant_file = 'model_quantized.onnx'
+    if not os.path.exists(os.path.join(quant_dir, quant_file)):
+        logger.info('Quantizing %s to int8 ONNX in %s', MODEL_NAME, quant_dir)
+        ort_model = ORTModelForSequenceClassification.from_pretrained(
+            MODEL_NAME, export=True, provider='CPUExecutionProvider', cache_dir=CACHE_DIR)
+        quantizer = ORTQuantizer.from_pretrained(ort_model)
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=quant_dir, quantization_config=qconfig)
+    return ORTModelForSequenceClassification.from_pretrained(
+        quant_dir, file_name=quant_file, provider='CPUExecutionProvider')
+
+
+def _optimize_model(model, tokenizer):
+    """Apply BetterTransformer and torch.compile to an fp32 torch model.
+
+    Each step is optional: a missing `optimum`, an unsupported architecture or
+    a PyTorch without `torch.compile` leaves the model as it was. torch.compile
+    is lazy, so one warm-up forward runs here and the eager forward is restored
+    if compiling fails, instead of failing the first /predict.
+    """
+    try:
+        from optimum.bettertransformer import BetterTransformer
+        model = BetterTransformer.transform(model)
+    except Exception as e:
+        logger.info('BetterTransformer not applied: %s', e)
+    model.eval()
+    eager_forward = model.forward
+    try:
+        import torch
+        # compile only forward so the pipeline still sees a regular HF model;
+        # dynamic shapes avoid a recompile for every padded batch length
+        model.forward = torch.compile(eager_forward, mode='reduce-overhead', fullgraph=False, dynamic=True)
+        batch = tokenizer(['warm-up'], return_tensors='pt', padding=True, truncation=True).to(model.device)
+        with torch.no_grad():
+            model(**batch)
+    except Exception as e:
+        model.forward = eager_forward
+        logger.info('torch.compile not applied: %s', e)
+    return model
+
+
 def get_finbert(reload: bool = False):
     """Lazily load the FinBERT pipeline. Call with reload=True to force re-load.
 
@@ -23,69 +92,184 @@ def get_finbert(reload: bool = False):
     module import.
     """
     global _FINBERT
-    if reload:
-        _FINBERT = None
-    if _FINBERT is not None:
-        return _FINBERT
+    with _LOAD_LOCK:
+        if reload:
+            _FINBERT = None
+        if _FINBERT is not None:
+            return _FINBERT
+        _FINBERT = _load_finbert()
+    return _FINBERT
+
 
+def _load_finbert():
     try:
         # import inside function to allow tests to monkeypatch
         from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
 
-        logger.info('Loading model %s (cache_dir=%s)', MODEL_NAME, CACHE_DIR)
-        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, cache_dir=CACHE_DIR) if CACHE_DIR else AutoTokenizer.from_pretrained(MODEL_NAME)
-        model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME, cache_dir=CACHE_DIR) if CACHE_DIR else AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
-        _FINBERT = pipeline('sentiment-analysis', model=model, tokenizer=tokenizer)
+        logger.info('Loading model %s (backend=%s, cache_dir=%s)', MODEL_NAME, FINBERT_BACKEND, CACHE_DIR)
+        # Rust "fast" tokenizer, capped at MAX_LENGTH so batches pad to the longest item only
+        tokenizer = AutoTokenizer.from_pretrained(
+            MODEL_NAME, use_fast=True, model_max_length=MAX_LENGTH, cache_dir=CACHE_DIR)
+        if FINBERT_BACKEND == 'onnx-int8':
+            model = _load_onnx_int8()
+        elif FINBERT_BACKEND == 'bnb-int8':
+            from transformers import BitsAndBytesConfig
+            model = AutoModelForSequenceClassification.from_pretrained(
+                MODEL_NAME, cache_dir=CACHE_DIR,
+                quantization_config=BitsAndBytesConfig(load_in_8bit=True), device_map='auto')
+        else:
+            model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME, cache_dir=CACHE_DIR) if CACHE_DIR else AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+            if FINBERT_OPTIMIZE:
+                model = _optimize_model(model, tokenizer)
+        return pipeline('sentiment-analysis', model=model, tokenizer=tokenizer, batch_size=MAX_BATCH)
     except Exception as e:
         logger.exception('Failed to load FinBERT model: %s', e)
-        _FINBERT = None
-    return _FINBERT
+        return None
+
 
+class _MicroBatcher:
+    """Coalesce concurrent single-text requests into batched pipeline calls.
 
-@app.route('/health')
-def health():
+    Requests enqueue ``(text, Future)`` and await the future; a background task
+    waits up to ``window_ms`` after the first item (or until ``max_batch`` items
+    are queued) and runs one inference over the list in a worker thread so the
+    event loop stays free.
+    """
+
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, text: str) -> Any:
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, fut))
+        if self._queue.qsize() >= self.max_batch:
+            self._full.set()
+        return await fut
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        if self.window > 0 and self._queue.qsize() < self.max_batch - 1:
+            self._full.clear()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _loop(self):
+        while True:
+            batch = await self._collect()
+            futures = [fut for _, fut in batch]
+            try:
+                finbert = _FINBERT or await asyncio.to_thread(get_finbert)
+                if finbert is None:
+                    raise RuntimeError('model not loaded')
+                results = await asyncio.to_thread(
+                    finbert, [text for text, _ in batch],
+                    truncation=True, padding='longest', max_length=MAX_LENGTH)
+                if len(results) != len(batch):
+                    raise RuntimeError(f'expected {len(batch)} results, got {len(results)}')
+            except Exception as e:
+                for fut in futures:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for fut, res in zip(futures, results):
+                # the client may have gone away while the batch ran
+                if not fut.done():
+                    fut.set_result(res)
+
+
+_BATCHER = _MicroBatcher(BATCH_WINDOW_MS, MAX_BATCH)
+
+
+@app.on_event('startup')
+async def on_startup():
+    _BATCHER.start()
+    # Warm the model in the background so /health answers while it downloads
+    asyncio.get_running_loop().run_in_executor(None, get_finbert)
+
+
+@app.on_event('shutdown')
+async def on_shutdown():
+    await _BATCHER.stop()
+
+
+@app.get('/health')
+async def health():
     """Health endpoint. Returns whether the model is loaded.
 
     This endpoint does not trigger a model download; it only reports whether
     the pipeline has already been loaded into memory.
     """
-    return jsonify({'ok': _FINBERT is not None, 'model_name': MODEL_NAME})
+    return {'ok': _FINBERT is not None, 'model_name': MODEL_NAME}
 
 
-@app.route('/predict', methods=['POST'])
-def predict():
+@app.post('/predict')
+async def predict(request: Request):
     """Predict endpoint. Loads model lazily on first call.
 
     Body: { "text": "..." }
     """
-    finbert = _FINBERT or get_finbert()
+    finbert = _FINBERT or await asyncio.to_thread(get_finbert)
     if finbert is None:
-        return jsonify({'error': 'model not loaded'}), 503
+        return ORJSONResponse({'error': 'model not loaded'}, status_code=503)
 
-    data = request.json or {}
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        data = {}
     text = data.get('text', '')
     if not isinstance(text, str) or text.strip() == '':
-        return jsonify({'error': 'missing or empty "text" in request body'}), 400
+        return ORJSONResponse({'error': 'missing or empty "text" in request body'}, status_code=400)
 
     # keep requests bounded
-    text = text[:4096]
+    text = text[:MAX_CHARS]
 
     try:
-        res = finbert(text)
-        return jsonify(res)
+        # one result per input; keep the single-item list shape of finbert(text)
+        res = await _BATCHER.submit(text)
+        return [res]
     except Exception:
         logger.exception('Error during model inference')
-        return jsonify({'error': 'inference failed'}), 500
+        return ORJSONResponse({'error': 'inference failed'}, status_code=500)
 
 
-@app.route('/reload', methods=['POST'])
-def reload_model():
+@app.post('/reload')
+async def reload_model():
     """Force reload the model from disk/network. Useful for testing and recovery."""
-    fin = get_finbert(reload=True)
-    return jsonify({'ok': fin is not None})
+    fin = await asyncio.to_thread(get_finbert, True)
+    return {'ok': fin is not None}
 
 
 if __name__ == '__main__':
+    import uvicorn
+
     host = os.getenv('HOST', '0.0.0.0')
     port = int(os.getenv('PORT', '5000'))
-    app.run(host=host, port=port)
+    uvicorn.run(app, host=host, port=port)
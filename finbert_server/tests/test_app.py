@@ -1,6 +1,6 @@
 import json
 import pytest
-from flask import Flask
+from fastapi.testclient import TestClient
 
 from finbert_server import app as app_module
 
@@ -10,42 +10,37 @@ class DummyPipeline:
         return [{"label": "POSITIVE", "score": 0.99, "text": text}]
 
 
+class Dummy:
+    # one shared result dict; the pipeline contract is one result per input text
+    _RESULT = {"label": "NEUTRAL", "score": 0.5}
+
+    def __call__(self, texts, **kwargs):
+        return [self._RESULT] * len(texts)
+
+
+@pytest.fixture(scope='module')
+def dummy_pipeline():
+    return Dummy()
+
+
 @pytest.fixture(autouse=True)
-def patch_pipeline(monkeypatch):
-    # Monkeypatch the transformers pipeline used in get_finbert
-    class Dummy:
-        def __init__(self, *args, **kwargs):
-            pass
-
-        def __call__(self, text):
-            return [{"label": "NEUTRAL", "score": 0.5, "text": text}]
-
-    def fake_pipeline(*args, **kwargs):
-        return Dummy()
-
-    # Ensure the app uses a preloaded pipeline so get_finbert() is not invoked
-    try:
-        import finbert_server.app as app_mod
-        app_mod._FINBERT = fake_pipeline()
-    except Exception:
-        # fallback: set attributes on the module path
-        monkeypatch.setattr('finbert_server.app.pipeline', fake_pipeline, raising=False)
-        monkeypatch.setattr('finbert_server.app.AutoTokenizer', lambda *a, **k: None, raising=False)
-        monkeypatch.setattr('finbert_server.app.AutoModelForSequenceClassification', lambda *a, **k: None, raising=False)
+def patch_pipeline(dummy_pipeline):
+    # Preload the shared dummy so get_finbert() never imports transformers;
+    # re-set per test because /reload clears the module singleton.
+    app_module._FINBERT = dummy_pipeline
     yield
 
 
 @pytest.fixture
 def client():
-    app_module.app.config['TESTING'] = True
-    with app_module.app.test_client() as c:
+    with TestClient(app_module.app) as c:
         yield c
 
 
 def test_health_initially_unloaded(client):
     resp = client.get('/health')
     assert resp.status_code == 200
-    body = resp.get_json()
+    body = resp.json()
     # Initially the model should not be loaded (lazy)
     assert body['ok'] in (True, False)
     assert 'model_name' in body
@@ -55,17 +50,45 @@ def test_predict_and_reload(client):
     # Trigger load via predict (monkeypatched pipeline will be used)
     resp = client.post('/predict', json={'text': 'hello world'})
     assert resp.status_code == 200
-    j = resp.get_json()
+    j = resp.json()
     assert isinstance(j, list)
     assert 'label' in j[0]
 
     # Force reload endpoint
     resp2 = client.post('/reload')
     assert resp2.status_code == 200
-    assert resp2.get_json().get('ok') in (True, False)
+    assert resp2.json().get('ok') in (True, False)
 
 
 def test_invalid_payload(client):
     resp = client.post('/predict', json={'text': ''})
     assert resp.status_code == 400
 
+
+
+def test_concurrent_predicts_share_a_batch(client, monkeypatch):
+    import threading
+    import finbert_server.app as app_mod
+
+    batch_sizes = []
+
+    def recording(texts, **kwargs):
+        batch_sizes.append(len(texts))
+        return [{"label": "NEUTRAL", "score": 0.5, "text": t} for t in texts]
+
+    monkeypatch.setattr(app_mod, '_FINBERT', recording)
+    monkeypatch.setattr(app_mod._BATCHER, 'window', 0.2)
+
+    results = {}
+
+    def call(i):
+        results[i] = client.post('/predict', json={'text': f't{i}'}).json()
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(batch_sizes) == 4 and len(batch_sizes) < 4
+    assert all(results[i][0]['text'] == f't{i}' for i in range(4))
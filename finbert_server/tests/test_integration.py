@@ -1,6 +1,7 @@
 import pytest
 import os
 import time
+from fastapi.testclient import TestClient
 from finbert_server import app as app_module
 
 pytestmark = pytest.mark.integration
@@ -16,14 +17,11 @@ def test_predict_integration(tmp_path):
     # Ensure we reload the model in case previous tests modified state
     app_module._FINBERT = None
 
-    app_module.app.config['TESTING'] = True
-    with app_module.app.test_client() as client:
+    with TestClient(app_module.app) as client:
         # Trigger a real model load (may take time while downloading)
         resp = client.post('/predict', json={'text': 'Stocks rallied after the earnings beat'})
         assert resp.status_code == 200
-        j = resp.get_json()
+        j = resp.json()
         assert isinstance(j, list)
         assert 'label' in j[0]
         assert 'score' in j[0]
-
-*** End Patch
\ No newline at end of file
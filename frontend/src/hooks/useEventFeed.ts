@@ -14,6 +14,7 @@
 
 import { useCallback, useEffect, useRef, useState } from 'react';
 import { Event, EventCategory, EventSeverity } from '../types/eventTypes';
+import { frameEvents } from '../lib/utils';
 
 interface EventFeedOptions {
     maxEvents?: number;
@@ -151,6 +152,7 @@ export default function useEventFeed(options: EventFeedOptions = {}) {
             const wsUrl = `${protocol}//${window.location.host}/api/ws/monitor`;
 
             wsRef.current = new WebSocket(wsUrl);
+            wsRef.current.binaryType = 'arraybuffer';
 
             wsRef.current.onopen = () => {
                 if (!mountedRef.current) return;
@@ -169,9 +171,10 @@ export default function useEventFeed(options: EventFeedOptions = {}) {
                 if (!mountedRef.current) return;
 
                 try {
-                    const rawData = JSON.parse(event.data);
-                    const transformedEvent = transformEvent ? transformEvent(rawData) : defaultTransformEvent(rawData);
-                    addEvent(transformedEvent);
+                    for (const rawData of frameEvents(event.data)) {
+                        const transformedEvent = transformEvent ? transformEvent(rawData) : defaultTransformEvent(rawData);
+                        addEvent(transformedEvent);
+                    }
                 } catch (error) {
                     console.warn('Failed to parse WebSocket event:', error);
                     // Create a fallback event for unparseable data
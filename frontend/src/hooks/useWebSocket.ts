@@ -7,6 +7,7 @@
 
 import { useCallback, useEffect, useRef, useState } from 'react';
 import { WebSocketEvent } from '../types';
+import { frameEvents } from '../lib/utils';
 
 export interface UseWebSocketOptions {
   onEvent?: (event: WebSocketEvent) => void;
@@ -41,6 +42,7 @@ export function useWebSocket(
 
     try {
       const ws = new WebSocket(url);
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -56,9 +58,9 @@ export function useWebSocket(
 
       ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data) as WebSocketEvent;
-          setLastEvent(data);
-          onEvent?.(data);
+          const events = frameEvents(event.data) as WebSocketEvent[];
+          events.forEach((data) => onEvent?.(data));
+          if (events.length > 0) setLastEvent(events[events.length - 1]);
         } catch (error) {
           console.warn('Failed to parse WebSocket message:', error);
         }
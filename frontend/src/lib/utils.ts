@@ -3,4 +3,18 @@ import { twMerge } from "tailwind-merge"
 
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
-}
\ No newline at end of file
+}
+
+const frameDecoder = new TextDecoder()
+
+// The monitor socket sends UTF-8 JSON as binary frames; accept text frames too.
+export function frameText(data: string | ArrayBuffer): string {
+  return typeof data === "string" ? data : frameDecoder.decode(data)
+}
+
+// Parse one monitor frame into its events; the server merges bursts into
+// a single { type: "multi", events: [...] } frame.
+export function frameEvents(data: string | ArrayBuffer): any[] {
+  const parsed = JSON.parse(frameText(data))
+  return parsed?.type === "multi" && Array.isArray(parsed.events) ? parsed.events : [parsed]
+}
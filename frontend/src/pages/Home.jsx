@@ -1,11 +1,13 @@
 import React, { useEffect, useState } from 'react'
+import { frameEvents } from '../lib/utils'
 
 export default function Home(){
   const [snap, setSnap] = useState(null)
   useEffect(()=>{
     const ws = new WebSocket((window.location.origin.replace('http','ws')) + '/api/ws/monitor')
+    ws.binaryType = 'arraybuffer'
     ws.onmessage = (e)=>{
-      try{ setSnap(JSON.parse(e.data)) }catch(err){}
+      try{ const evs = frameEvents(e.data); setSnap(evs[evs.length - 1]) }catch(err){}
     }
     ws.onclose = ()=>console.log('ws closed')
     return ()=>ws.close()
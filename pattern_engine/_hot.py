@@ -0,0 +1,172 @@
+"""JIT-compiled per-tick kernels for the pattern detector and replay runner.
+
+This module is guarded: when `numba` is installed the kernels are compiled
+with ``@njit(cache=True)``; otherwise ``njit`` is a no-op and the same code
+runs as plain Python, so the detector imports cleanly everywhere.
+"""
+import math
+
+import numpy as np
+
+try:
+    from numba import njit  # type: ignore
+    HAS_NUMBA = True
+except ImportError:  # pragma: no cover - depends on the environment
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+
+# pattern ids returned by update_detect; index 0 means no named pattern
+PATTERNS = (None, "ema_crossover", "vwap_deviation", "volume_spike", "volatility_breakout")
+
+# layout of the per-symbol state array; the last-signal time is kept apart as
+# integer nanoseconds so the cooldown check stays exact
+EMA_FAST, EMA_SLOW, VWAP_PV, VWAP_VOLUME, W_COUNT, W_MEAN, W_M2, AVG_VOLUME = range(8)
+STATE_SIZE = 8
+
+
+def new_state() -> np.ndarray:
+    """Fresh per-symbol state: EMAs unset (NaN), sums and Welford at zero."""
+    state = np.zeros(STATE_SIZE, dtype=np.float64)
+    state[EMA_FAST] = state[EMA_SLOW] = state[AVG_VOLUME] = np.nan
+    return state
+
+
+def new_states(n: int) -> np.ndarray:
+    """``n`` fresh state rows, one per symbol (see new_state)."""
+    states = np.zeros((n, STATE_SIZE), dtype=np.float64)
+    states[:, EMA_FAST] = states[:, EMA_SLOW] = states[:, AVG_VOLUME] = np.nan
+    return states
+
+
+@njit(cache=True)
+def _ema(value, x, alpha):
+    if math.isnan(value):
+        return x
+    return alpha * x + (1 - alpha) * value
+
+
+@njit(cache=True)
+def update_detect(state, last_ns, price, volume, ts_ns, volume_alpha, spike_multiplier, score_min, cooldown_ns):
+    """Update one symbol's indicators with a tick and score it.
+
+    Same rules as the original SymbolState.update_and_detect. ``ts_ns`` and
+    ``last_ns`` (the symbol's previous signal) are integer nanoseconds; the
+    caller stores ``ts_ns`` as the new ``last_ns`` when ``fired``. Returns
+    ``(fired, score, pattern_id, ema_fast, ema_slow, vwap, volatility)``.
+    """
+    ema_fast = _ema(state[EMA_FAST], price, 0.1)
+    ema_slow = _ema(state[EMA_SLOW], price, 0.05)
+    state[EMA_FAST] = ema_fast
+    state[EMA_SLOW] = ema_slow
+    state[VWAP_PV] += price * volume
+    state[VWAP_VOLUME] += volume
+    vwap = 0.0 if state[VWAP_VOLUME] == 0 else state[VWAP_PV] / state[VWAP_VOLUME]
+    state[W_COUNT] += 1
+    n = state[W_COUNT]
+    delta = price - state[W_MEAN]
+    state[W_MEAN] += delta / n
+    state[W_M2] += delta * (price - state[W_MEAN])
+    volatility = math.sqrt(state[W_M2] / (n - 1)) if n > 1 else 0.0
+
+    # Threshold gates feed the score through 0/1 masks and select-style
+    # assignments rather than nested ifs, which mispredict on noisy ticks.
+    # Relative thresholds are compared as |a - b| > t * |b| so only a tick
+    # that passes a gate pays for the division.
+    score = 0.0
+    pattern = 0
+
+    # EMA Crossover Pattern
+    if ema_fast != 0 and ema_slow != 0:
+        ema_gap = ema_fast - ema_slow
+        hit = abs(ema_gap) > 0.01 * abs(ema_slow)  # 1% difference threshold
+        score += (ema_gap / ema_slow * 2.0) if hit else 0.0
+        pattern = 1 if hit else pattern
+
+    # VWAP Deviation Pattern
+    if vwap != 0:
+        vwap_gap = price - vwap
+        hit = abs(vwap_gap) > 0.005 * abs(vwap)  # 0.5% deviation threshold
+        score += (vwap_gap / vwap * 1.5) if hit else 0.0
+        pattern = 2 if hit and pattern == 0 else pattern
+
+    # Volume Spike Pattern (adaptive average via EMA)
+    if volume > 0:
+        avg_volume = _ema(state[AVG_VOLUME], volume, volume_alpha)
+        state[AVG_VOLUME] = avg_volume
+        if avg_volume == 0:
+            avg_volume = volume
+        hit = volume > spike_multiplier * avg_volume  # avg_volume > 0 here
+        score += (0.6 * (score > 0) - 0.3) * hit  # +0.3 when score > 0, else -0.3
+        pattern = 3 if hit else pattern
+
+    # Volatility Pattern
+    if n > 5:
+        reference = ema_fast if ema_fast != 0 else price
+        hit = abs(price - reference) > 2 * volatility * abs(price)  # 2 standard deviations
+        score += (0.8 * (score > 0) - 0.4) * hit
+        pattern = 4 if hit else pattern
+
+    score = min(1.0, max(-1.0, score))
+    fired = (abs(score) > score_min) & (ts_ns - last_ns > cooldown_ns)
+    return fired, score, pattern, ema_fast, ema_slow, vwap, volatility
+
+
+@njit(cache=True)
+def replay_features(price, volume):
+    """Replay features for one symbol's ticks in order, one row per tick.
+
+    Columns are EMA(0.2), cumulative VWAP, Welford mean and sample std, the
+    same values runner.SymbolState yields tick by tick.
+    """
+    n = price.shape[0]
+    out = np.empty((n, 4), dtype=np.float64)
+    ema = math.nan
+    pv = 0.0
+    vol_sum = 0.0
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        ema = _ema(ema, price[i], 0.2)
+        pv += price[i] * volume[i]
+        vol_sum += volume[i]
+        count += 1
+        delta = price[i] - mean
+        mean += delta / count
+        m2 += delta * (price[i] - mean)
+        out[i, 0] = ema
+        out[i, 1] = 0.0 if vol_sum == 0 else pv / vol_sum
+        out[i, 2] = mean
+        out[i, 3] = math.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+    return out
+
+
+@njit(cache=True)
+def update_detect_batch(states, last_ns, rows, price, volume, ts_ns, volume_alpha, spike_multiplier, score_min, cooldown_ns):
+    """update_detect for ``rows[k]`` of ``states``/``last_ns`` with the k-th tick of a batch.
+
+    Returns ``fired`` (bool per tick) and ``out`` with one row per tick:
+    score, pattern_id, ema_fast, ema_slow, vwap, volatility.
+    """
+    n = rows.shape[0]
+    fired = np.zeros(n, dtype=np.bool_)
+    out = np.empty((n, 6), dtype=np.float64)
+    for k in range(n):
+        f, score, pattern, ema_fast, ema_slow, vwap, volatility = update_detect(
+            states[rows[k]], last_ns[rows[k]], price[k], volume[k], ts_ns,
+            volume_alpha, spike_multiplier, score_min, cooldown_ns)
+        if f:
+            last_ns[rows[k]] = ts_ns
+        fired[k] = f
+        out[k, 0] = score
+        out[k, 1] = pattern
+        out[k, 2] = ema_fast
+        out[k, 3] = ema_slow
+        out[k, 4] = vwap
+        out[k, 5] = volatility
+    return fired, out
@@ -8,34 +8,38 @@ import os
 from typing import Optional
 
 
-def _env_float(name: str, default: float) -> float:
+def _env_num(name: str, default, cast):
+    """Read `name` from the environment as `cast`, or `default` when unset/empty/malformed."""
     v = os.environ.get(name)
-    if v is None or v == "":
+    if not v:
         return default
     try:
-        return float(v)
-    except Exception:
+        return cast(v)
+    except ValueError:
         return default
 
 
+def _env_float(name: str, default: float) -> float:
+    return _env_num(name, default, float)
+
+
 def _env_int(name: str, default: int) -> int:
-    v = os.environ.get(name)
-    if v is None or v == "":
-        return default
-    try:
-        return int(v)
-    except Exception:
-        return default
+    return _env_num(name, default, int)
 
 
 @dataclass
 class PatternEngineConfig:
     # Redis
     redis_url: str = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    redis_max_connections: int = _env_int('REDIS_MAX_CONNECTIONS', 16)
 
     # Streams
     signals_stream: str = os.environ.get('SIGNALS_STREAM', 'signals:global')
     ticks_stream: str = os.environ.get('TICKS_STREAM', 'ticks:global')
+    # approximate MAXLEN cap applied on XADD (0 = unbounded); the tick stream,
+    # which grows by every symbol each period, has its own larger cap
+    stream_maxlen: int = _env_int('STREAM_MAXLEN', 100000)
+    ticks_stream_maxlen: int = _env_int('TICKS_STREAM_MAXLEN', 1000000)
 
     # Detection thresholds
     ema_diff_threshold: float = _env_float('EMA_DIFF_THRESHOLD', 0.01)
@@ -48,6 +52,12 @@ class PatternEngineConfig:
 
     # Cooldowns and timings
     signal_cooldown_seconds: int = _env_int('SIGNAL_COOLDOWN', 30)
+    # mock feed cadence: one batch of ticks every tick_period_seconds
+    tick_period_seconds: float = _env_float('TICK_PERIOD_SECONDS', 1.0)
+
+    # Symbol partitions: with PARTITION_COUNT > 1 the detector runs one process
+    # per partition, each owning a disjoint slice of the symbols
+    partition_count: int = _env_int('PARTITION_COUNT', 1)
 
     # Redis retry
     redis_max_retries: int = _env_int('REDIS_MAX_RETRIES', 3)
@@ -29,4 +29,5 @@ echo $$ > "$PIDFILE"
 chmod 644 "$PIDFILE"
 
 # exec uvicorn (replace shell with process)
-exec uvicorn pattern_engine.onnx_runner:app --host ${ONNX_RUNNER_HOST:-0.0.0.0} --port ${ONNX_RUNNER_PORT:-8001} --log-level info
+# one worker: the ONNX session (and its GPU arena) is shared in-process, not per worker
+exec uvicorn pattern_engine.onnx_runner:app --host ${ONNX_RUNNER_HOST:-0.0.0.0} --port ${ONNX_RUNNER_PORT:-8001} --workers 1 --loop uvloop --http httptools --log-level info
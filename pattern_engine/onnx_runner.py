@@ -12,11 +12,21 @@ The service accepts POST /infer with JSON body:
 and returns:
   {"probs": [..], "output": [...]}.
 
+POST /infer_bin takes the window as raw little-endian float32 bytes
+(Content-Type: application/octet-stream) and returns the first output the same
+way, with its shape in the X-Output-Shape header.
+
 This is intentionally minimal; for production use prefer gRPC or compiled runners.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from starlette.routing import Route
 from pydantic import BaseModel
+import asyncio
 import os
+import tempfile
+import threading
+import time
 import numpy as np
 import json
 import logging
@@ -27,6 +37,24 @@ MODEL_PATH = os.environ.get('ONNX_MODEL_PATH', 'models/toy_cnn.onnx')
 APP_HOST = os.environ.get('ONNX_RUNNER_HOST', '0.0.0.0')
 APP_PORT = int(os.environ.get('ONNX_RUNNER_PORT', '8080'))
 UDS_PATH = os.environ.get('UDS_PATH', '')
+# Concurrent /infer requests are coalesced into one session.run of up to
+# ONNX_MAX_BATCH windows, waiting at most ONNX_MAX_WAIT_MS for the batch to fill.
+MAX_BATCH = int(os.environ.get('ONNX_MAX_BATCH', '32'))
+MAX_WAIT_MS = float(os.environ.get('ONNX_MAX_WAIT_MS', '2'))
+# Prefer a CUDA EP variant that captures/replays a CUDA graph (static shapes only)
+CUDA_GRAPH = os.environ.get('ONNX_CUDA_GRAPH', '') in ('1', 'true', 'True')
+# TensorRT EP: persist built engines/timing caches so restarts skip the rebuild
+TRT_CACHE_DIR = os.environ.get('TRT_CACHE_DIR', '/var/cache/onnx_trt')
+# Dummy runs right after load so TRT/CUDA build kernels before the first request.
+# WARMUP_SHAPES lists window sizes to try when the model's window dim is dynamic.
+WARMUP_RUNS = int(os.environ.get('ONNX_WARMUP_RUNS', '2'))
+WARMUP_SHAPES = [int(w) for w in os.environ.get('WARMUP_SHAPES', '').split(',') if w.strip()]
+# fp32 (as exported), fp16 (needs onnxconverter-common) or int8 (dynamic quantization)
+PRECISION = os.environ.get('ONNX_PRECISION', 'fp32').lower()
+# Intra-op threads for the serving session; small batch-1 models rarely gain from more
+INTRA_OP_THREADS = int(os.environ.get('ORT_INTRA', '2'))
+# Unload sessions nobody has used for this many seconds (0 keeps them loaded)
+SESSION_IDLE_S = float(os.environ.get('ONNX_SESSION_IDLE_S', '0'))
 
 log = logging.getLogger('onnx_runner')
 logging.basicConfig(level=logging.INFO)
@@ -40,6 +68,82 @@ _session = None
 _input_name = None
 _output_name = None
 _model_shape = None
+# _model_shape for one request (dynamic batch dim -> 1), computed once at load
+_expected_shape = None
+# (io_binding, input OrtValue, output OrtValue) for CUDA sessions with static shapes
+_io = None
+# CPU session used when a GPU run fails; built once, not per failed request
+_cpu_session = None
+# /model/status response for the current session (reset when it is unloaded)
+_status_cache = None
+
+
+class _SessionRegistry:
+    """Process-wide map of model path -> loaded session with reference counts.
+
+    Requests acquire/release the session they run on; sessions with no
+    references that have been idle for longer than the sweep threshold (or are
+    unloaded explicitly) are dropped so their memory arenas are freed. Sessions
+    live in one process, so run uvicorn with a single worker to share them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # path -> [session, refs, last_used]
+
+    def put(self, path, session):
+        with self._lock:
+            self._entries[path] = [session, 0, time.monotonic()]
+
+    def acquire(self, path):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, path):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                entry[1] = max(0, entry[1] - 1)
+                entry[2] = time.monotonic()
+
+    def drop(self, path) -> bool:
+        """Remove `path` unless it is in use; returns True if removed."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[1]:
+                return False
+            del self._entries[path]
+            return True
+
+    def sweep(self, idle_s: float):
+        """Drop unreferenced sessions idle for more than `idle_s`; returns their paths."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [p for p, (_, refs, last) in self._entries.items() if not refs and now - last > idle_s]
+            for p in idle:
+                del self._entries[p]
+        return idle
+
+    def paths(self):
+        with self._lock:
+            return list(self._entries)
+
+
+_SESSIONS = _SessionRegistry()
+
+
+def _unload_session():
+    """Forget the current session and its buffers; the next request reloads it."""
+    global _session, _io, _cpu_session, _status_cache
+    _session = None
+    _io = None
+    _cpu_session = None
+    _status_cache = None
+    log.info('Unloaded ONNX session for %s', MODEL_PATH)
 
 
 def init_onnx_session():
@@ -49,7 +153,7 @@ def init_onnx_session():
     InferenceSession using a sequence of provider variants (CUDA/Trt/CPU),
     falling back to CPU if needed. It is safe to call multiple times.
     """
-    global ort, _session, _input_name, _output_name, _model_shape
+    global ort, _session, _input_name, _output_name, _model_shape, _expected_shape, _io, _cpu_session
 
     if _session is not None:
         return _session
@@ -74,12 +178,15 @@ def init_onnx_session():
 
     cuda_dev = int(os.environ.get('CUDA_DEVICE', '0'))
 
-    def try_session_with_variants(model_path):
+    def try_session_with_variants(model_path, cuda_graph=False):
         use_trt = os.environ.get('USE_TENSORRT', '') in ('1', 'true', 'True')
         variants = []
         if use_trt:
-            variants.append([( 'TensorrtExecutionProvider', {} ), ( 'CUDAExecutionProvider', {'device_id': cuda_dev} ), 'CPUExecutionProvider'])
-            variants.append([( 'TensorrtExecutionProvider', {} ), 'CPUExecutionProvider'])
+            trt_opts = _trt_provider_options(cuda_dev)
+            variants.append([( 'TensorrtExecutionProvider', trt_opts ), ( 'CUDAExecutionProvider', {'device_id': cuda_dev} ), 'CPUExecutionProvider'])
+            variants.append([( 'TensorrtExecutionProvider', trt_opts ), 'CPUExecutionProvider'])
+        if cuda_graph:
+            variants.append([( 'CUDAExecutionProvider', {'device_id': cuda_dev, 'enable_cuda_graph': '1'}), 'CPUExecutionProvider'])
         variants.extend([
             [( 'CUDAExecutionProvider', {'device_id': cuda_dev} ), 'CPUExecutionProvider'],
             [( 'CUDAExecutionProvider', {'device_id': cuda_dev, 'cudnn_conv_algo_search': 'HEURISTIC'}), 'CPUExecutionProvider'],
@@ -91,7 +198,7 @@ def init_onnx_session():
         for variant in variants:
             try:
                 log.info('Attempting InferenceSession with providers=%s', variant)
-                sess = ort.InferenceSession(model_path, providers=variant)
+                sess = ort.InferenceSession(model_path, sess_options=_session_options(), providers=variant)
                 try:
                     active = getattr(sess, 'get_providers', lambda: None)()
                 except Exception:
@@ -106,8 +213,10 @@ def init_onnx_session():
             raise last_exc
         return None, None, None
 
+    model_file = _converted_model_path(MODEL_PATH)
+
     try:
-        sess, used_variant, active = try_session_with_variants(MODEL_PATH)
+        sess, used_variant, active = try_session_with_variants(model_file, cuda_graph=CUDA_GRAPH)
         if sess is None:
             raise RuntimeError('Failed to create any ONNX session')
 
@@ -117,20 +226,33 @@ def init_onnx_session():
         if len(inputs) > 0:
             _input_name = inputs[0].name
             _model_shape = tuple(dim if isinstance(dim, int) else -1 for dim in inputs[0].shape)
+            _expected_shape = _request_shape(_model_shape)
         if len(outputs) > 0:
             _output_name = outputs[0].name
-        log.info('Loaded ONNX model %s requested_providers=%s active_providers=%s input=%s output=%s shape=%s', MODEL_PATH, used_variant, active, _input_name, _output_name, _model_shape)
+        _io = _init_io_binding(sess, cuda_dev)
+        if _uses_cuda_graph(used_variant) and not _warmup_cuda_graph():
+            # graphs need the persistent IOBinding buffers and a successful capture
+            log.warning('CUDA graph capture failed for providers=%s; recreating session without it', used_variant)
+            sess, used_variant, active = try_session_with_variants(model_file)
+            _session = sess
+            _io = _init_io_binding(sess, cuda_dev)
+        log.info('Loaded ONNX model %s requested_providers=%s active_providers=%s input=%s output=%s shape=%s', model_file, used_variant, active, _input_name, _output_name, _model_shape)
+        if any(p in (active or []) for p in ('CUDAExecutionProvider', 'TensorrtExecutionProvider')):
+            _cpu_session = _create_cpu_fallback()
+        _warmup()
+        _SESSIONS.put(MODEL_PATH, _session)
         return _session
     except Exception as e:
         try:
             log.warning('All CUDA session attempts failed, falling back to CPUExecutionProvider: %s', e)
-            sess = ort.InferenceSession(MODEL_PATH, providers=['CPUExecutionProvider'])
+            sess = ort.InferenceSession(MODEL_PATH, sess_options=_session_options(), providers=['CPUExecutionProvider'])
             _session = sess
             inputs = sess.get_inputs()
             outputs = sess.get_outputs()
             if len(inputs) > 0:
                 _input_name = inputs[0].name
                 _model_shape = tuple(dim if isinstance(dim, int) else -1 for dim in inputs[0].shape)
+                _expected_shape = _request_shape(_model_shape)
             if len(outputs) > 0:
                 _output_name = outputs[0].name
             try:
@@ -138,20 +260,233 @@ def init_onnx_session():
             except Exception:
                 active = None
             log.info('Loaded ONNX model %s (CPU fallback) active_providers=%s input=%s output=%s shape=%s', MODEL_PATH, active, _input_name, _output_name, _model_shape)
+            _warmup()
+            _SESSIONS.put(MODEL_PATH, _session)
             return _session
         except Exception as e2:
             log.exception('Failed to load ONNX model: %s ; %s', e, e2)
             _session = None
             return None
 
-@app.post('/infer')
-async def infer(req: InferRequest):
-    # ensure session is initialized lazily
-    if _session is None:
-        init_onnx_session()
-    if _session is None:
-        raise HTTPException(status_code=500, detail='ONNX session not initialized')
-    arr = np.array(req.window, dtype=np.float32)
+def _session_options():
+    """SessionOptions for the serving session, tuned for small-batch latency.
+
+    Full graph optimization, sequential execution with a small fixed
+    intra-op pool and no spin-waiting, so idle threads don't burn CPU between
+    requests.
+    """
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    so.intra_op_num_threads = INTRA_OP_THREADS
+    so.inter_op_num_threads = 1
+    so.add_session_config_entry('session.intra_op.allow_spinning', '0')
+    so.enable_mem_pattern = True
+    so.enable_cpu_mem_arena = True
+    return so
+
+
+def _create_cpu_fallback():
+    """Build the CPU session used to retry requests after GPU/cuDNN errors.
+
+    It only serves the occasional failed run, so it gets one thread and no
+    spinning to keep its memory and CPU footprint small.
+    """
+    try:
+        so = ort.SessionOptions()
+        so.intra_op_num_threads = 1
+        so.inter_op_num_threads = 1
+        so.add_session_config_entry('session.intra_op.allow_spinning', '0')
+        return ort.InferenceSession(MODEL_PATH, sess_options=so, providers=['CPUExecutionProvider'])
+    except Exception as e:
+        log.warning('Failed to create CPU fallback session: %s', e)
+        return None
+
+
+def _trt_provider_options(device_id: int) -> dict:
+    """TensorRT EP options with an on-disk engine and timing cache under TRT_CACHE_DIR."""
+    opts = {
+        'device_id': device_id,
+        'trt_fp16_enable': os.environ.get('TRT_FP16', '1') in ('1', 'true', 'True'),
+        'trt_max_workspace_size': int(os.environ.get('TRT_MAX_WORKSPACE', str(1 << 30))),
+    }
+    try:
+        os.makedirs(TRT_CACHE_DIR, exist_ok=True)
+        opts.update({
+            'trt_engine_cache_enable': True,
+            'trt_engine_cache_path': TRT_CACHE_DIR,
+            'trt_timing_cache_enable': True,
+            'trt_timing_cache_path': TRT_CACHE_DIR,
+        })
+    except OSError as e:
+        log.warning('TensorRT cache dir %s unavailable, engines will be rebuilt on start: %s', TRT_CACHE_DIR, e)
+    level = os.environ.get('TRT_BUILDER_OPT_LEVEL')
+    if level:
+        opts['trt_builder_optimization_level'] = int(level)
+    return opts
+
+
+def _converted_model_path(model_path: str) -> str:
+    """Return the model file to load for ONNX_PRECISION, converting it once.
+
+    The converted model is cached next to the original (or in the temp dir when
+    that is read-only) and rebuilt only when the source is newer. Any failure
+    falls back to the original fp32 model.
+    """
+    if PRECISION not in ('fp16', 'int8'):
+        return model_path
+    stem, ext = os.path.splitext(os.path.basename(model_path))
+    name = f'{stem}.{PRECISION}{ext or ".onnx"}'
+    candidates = [os.path.join(os.path.dirname(model_path) or '.', name),
+                  os.path.join(tempfile.gettempdir(), name)]
+    for out in candidates:
+        if os.path.exists(out) and os.path.getmtime(out) >= os.path.getmtime(model_path):
+            return out
+    for out in candidates:
+        try:
+            if PRECISION == 'fp16':
+                import onnx
+                from onnxconverter_common import float16
+                # keep float32 I/O so callers keep sending float32; ORT casts once inside
+                onnx.save(float16.convert_float_to_float16_model_path(model_path, keep_io_types=True), out)
+            else:
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+                quantize_dynamic(model_path, out, weight_type=QuantType.QInt8)
+            log.info('Converted %s to %s at %s', model_path, PRECISION, out)
+            return out
+        except OSError as e:
+            log.warning('Cannot write %s model to %s: %s', PRECISION, out, e)
+        except Exception as e:
+            log.warning('%s conversion failed, using the original model: %s', PRECISION, e)
+            break
+    return model_path
+
+
+def _warmup_shapes():
+    """Input shapes to warm up: the static shape, or dynamic dims filled in.
+
+    Dynamic dims become 1, except a dynamic last (window) dim, which takes each
+    size from WARMUP_SHAPES.
+    """
+    if not _model_shape:
+        return []
+    base = tuple(d if d > 0 else 1 for d in _model_shape)
+    if _model_shape[-1] == -1 and WARMUP_SHAPES:
+        return [base[:-1] + (w,) for w in WARMUP_SHAPES]
+    return [base]
+
+
+def _run_errors():
+    """Exceptions session.run raises for runtime failures (not programming errors)."""
+    try:
+        from onnxruntime.capi import onnxruntime_pybind11_state as state
+    except ImportError:
+        return (RuntimeError,)
+    return (RuntimeError, state.Fail, state.RuntimeException, state.EPFail,
+            state.InvalidArgument, state.NotImplemented)
+
+
+def _warmup():
+    """Run a few zero-filled inferences so engine builds happen before traffic.
+
+    A shape the model rejects or a provider failure is logged and skipped;
+    anything else is a bug and propagates.
+    """
+    errors = _run_errors()
+    for shape in _warmup_shapes():
+        start = time.perf_counter()
+        try:
+            dummy = np.zeros(shape, dtype=np.float32)
+            for _ in range(max(1, WARMUP_RUNS)):
+                _session_run(_session, dummy)
+        except errors as e:
+            log.warning('Warm-up inference failed for shape=%s: %s', shape, e)
+            continue
+        log.info('Warm-up shape=%s runs=%d took %.1f ms (providers=%s)', shape, WARMUP_RUNS,
+                 (time.perf_counter() - start) * 1000.0, _session.get_providers())
+
+
+def _uses_cuda_graph(variant) -> bool:
+    return any(isinstance(p, tuple) and p[1].get('enable_cuda_graph') == '1' for p in (variant or []))
+
+
+def _warmup_cuda_graph() -> bool:
+    """Trigger CUDA graph capture through the persistent IOBinding buffers.
+
+    ORT captures on the first run_with_iobinding and replays afterwards, so the
+    bound device addresses must never change. Returns False if capture fails or
+    the session has no static-shape binding.
+    """
+    if _io is None:
+        return False
+    binding, inp, _ = _io
+    try:
+        inp.update_inplace(np.zeros(_model_shape, dtype=np.float32))
+        _session.run_with_iobinding(binding)  # capture
+        _session.run_with_iobinding(binding)  # replay
+        return True
+    except Exception as e:
+        log.warning('CUDA graph warm-up failed: %s', e)
+        return False
+
+
+def _init_io_binding(sess, device_id: int):
+    """Preallocate device input/output OrtValues bound once to the session.
+
+    Only for CUDA sessions whose single float input/output have fully static
+    shapes; reusing the same device buffers avoids ORT allocating and copying
+    into fresh ones on every run. Returns None when not applicable.
+    """
+    try:
+        if 'CUDAExecutionProvider' not in (sess.get_providers() or []):
+            return None
+        outputs = sess.get_outputs()
+        if not _model_shape or -1 in _model_shape or len(outputs) != 1:
+            return None
+        out_shape = outputs[0].shape
+        if not all(isinstance(d, int) for d in out_shape) or outputs[0].type != 'tensor(float)':
+            return None
+        binding = sess.io_binding()
+        inp = ort.OrtValue.ortvalue_from_shape_and_type(list(_model_shape), np.float32, 'cuda', device_id)
+        out = ort.OrtValue.ortvalue_from_shape_and_type(list(out_shape), np.float32, 'cuda', device_id)
+        binding.bind_ortvalue_input(_input_name, inp)
+        binding.bind_ortvalue_output(_output_name, out)
+        log.info('Using IOBinding with preallocated CUDA buffers input=%s output=%s', _model_shape, out_shape)
+        return binding, inp, out
+    except Exception as e:
+        log.warning('IOBinding setup failed, using session.run: %s', e)
+        return None
+
+
+def _session_run(sess, arr: np.ndarray):
+    # the IOBinding buffers belong to the current session only
+    if _io is not None and sess is _session and arr.shape == _model_shape:
+        binding, inp, out = _io
+        # copy the host window into the persistent device input buffer
+        inp.update_inplace(arr)
+        sess.run_with_iobinding(binding)
+        return [out.numpy()]
+    return sess.run(None, {_input_name: arr})
+
+
+def _request_shape(model_shape):
+    """Shape of a single request window: the model's input shape with a dynamic
+    batch dim set to 1, or [1,1,N] when more than one dim is dynamic."""
+    if not model_shape:
+        return (1, 1, -1)
+    shape = tuple(1 if i == 0 and d == -1 else d for i, d in enumerate(model_shape))
+    return shape if shape.count(-1) <= 1 else (1, 1, -1)
+
+
+def _to_input(window) -> np.ndarray:
+    """Convert a request window to the float32 array the model expects."""
+    if _expected_shape is not None and -1 not in _expected_shape:
+        # static model shape: one typed conversion straight into it
+        try:
+            return np.asarray(window, dtype=np.float32).reshape(_expected_shape)
+        except ValueError:
+            pass
+    arr = np.array(window, dtype=np.float32)
     # guess expected shape: model likely expects [1,1,WINDOW]
     if arr.ndim == 1:
         arr = arr.reshape(1, 1, -1)
@@ -159,43 +494,247 @@ async def infer(req: InferRequest):
         # if shape (1, N) -> make (1,1,N)
         if arr.shape[0] == 1:
             arr = arr.reshape(1, 1, arr.shape[1])
-    # ensure float32
-    arr = arr.astype(np.float32)
+    return arr
+
+
+def _is_gpu_error(msg: str) -> bool:
+    return 'CUDNN' in msg or 'CUDNN_FE' in msg or 'CUDNN_BACKEND_API_FAILED' in msg or 'CUDA' in msg
+
+
+def _run_session(sess, arr: np.ndarray):
+    """Run `sess` on `arr`; returns (outputs, fallback).
+
+    On common cuDNN/CUDA backend failures the input is retried on a CPU session
+    and fallback is 'cpu'; other errors propagate.
+    """
+    global _cpu_session
     try:
-        inputs = { _input_name: arr }
-        out = _session.run(None, inputs)
-        # convert outputs to python lists
-        out_py = [o.tolist() for o in out]
-        return { 'probs': out_py[0] if len(out_py)>0 else None, 'output': out_py }
+        return _session_run(sess, arr), None
     except Exception as e:
-        # detect common cuDNN/CUDA backend failures and retry on CPU
-        msg = str(e)
         log.exception('Inference failed: %s', e)
-        if 'CUDNN' in msg or 'CUDNN_FE' in msg or 'CUDNN_BACKEND_API_FAILED' in msg or 'CUDA' in msg:
-            log.warning('Detected GPU/cuDNN failure, retrying inference on CPU')
+        if not _is_gpu_error(str(e)):
+            raise
+        log.warning('Detected GPU/cuDNN failure, retrying inference on CPU')
+        if _cpu_session is None:
+            _cpu_session = _create_cpu_fallback()
+        if _cpu_session is None:
+            raise
+        return _cpu_session.run(None, {_input_name: arr}), 'cpu'
+
+
+def _batchable(arrays) -> bool:
+    """True when the windows can be stacked along the model's (dynamic) batch axis."""
+    if len(arrays) < 2 or not _model_shape or _model_shape[0] != -1:
+        return False
+    first = arrays[0].shape
+    return first[0] == 1 and all(a.shape == first for a in arrays)
+
+
+def _run_batch(sess, arrays):
+    """Run a list of [1,...] windows on `sess`, stacked into one call when possible."""
+    if not _batchable(arrays):
+        return [_run_session(sess, a) for a in arrays]
+    outs, fallback = _run_session(sess, np.concatenate(arrays, axis=0))
+    n = len(arrays)
+    # split every batch-major output back into per-request [1,...] slices
+    return [([o[i:i + 1] if getattr(o, 'shape', ())[:1] == (n,) else o for o in outs], fallback)
+            for i in range(n)]
+
+
+class _InferBatcher:
+    """Coalesce concurrent /infer windows into batched session runs.
+
+    Requests enqueue ``(array, session, Future)``; a background task waits up
+    to ``max_wait_ms`` after the first item (or until ``max_batch`` are
+    queued), runs them in a worker thread on the session each request acquired
+    and resolves each future with its slice.
+    """
+
+    def __init__(self, max_wait_ms: float, max_batch: int):
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = None
+        self._full = None
+        self._task = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, arr: np.ndarray, sess):
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((arr, sess, fut))
+        if self._queue.qsize() >= self.max_batch:
+            self._full.set()
+        return await fut
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        if self.max_wait > 0 and self._queue.qsize() < self.max_batch - 1:
+            self._full.clear()
             try:
-                # create a temporary CPU session if not already cached
-                cpu_sess = None
-                try:
-                    cpu_sess = ort.InferenceSession(MODEL_PATH, providers=['CPUExecutionProvider'])
-                except Exception as e2:
-                    log.exception('Failed to create CPU session for fallback: %s', e2)
-                    raise HTTPException(status_code=500, detail=str(e))
+                await asyncio.wait_for(self._full.wait(), self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _loop(self):
+        while True:
+            batch = await self._collect()
+            # a reload between requests can leave two sessions in one batch
+            groups = {}
+            for arr, sess, fut in batch:
+                groups.setdefault(id(sess), (sess, [], []))
+                groups[id(sess)][1].append(arr)
+                groups[id(sess)][2].append(fut)
+            for sess, arrays, futures in groups.values():
                 try:
-                    out = cpu_sess.run(None, {_input_name: arr})
-                    out_py = [o.tolist() for o in out]
-                    return { 'probs': out_py[0] if len(out_py)>0 else None, 'output': out_py, 'fallback': 'cpu' }
-                except Exception as e3:
-                    log.exception('CPU fallback inference also failed: %s', e3)
-                    raise HTTPException(status_code=500, detail=str(e3))
-            except HTTPException:
-                raise
-            except Exception:
-                raise HTTPException(status_code=500, detail=str(e))
+                    results = await asyncio.to_thread(_run_batch, sess, arrays)
+                except Exception as e:
+                    for fut in futures:
+                        if not fut.done():
+                            fut.set_exception(e)
+                    continue
+                for fut, res in zip(futures, results):
+                    if not fut.done():
+                        fut.set_result(res)
+
+
+_BATCHER = _InferBatcher(MAX_WAIT_MS, MAX_BATCH)
+
+
+_sweeper_task = None
+
+
+async def _sweep_idle_sessions(idle_s: float):
+    while True:
+        await asyncio.sleep(max(1.0, idle_s / 2))
+        if MODEL_PATH in _SESSIONS.sweep(idle_s):
+            _unload_session()
+
+
+@app.on_event('startup')
+async def on_startup():
+    global _sweeper_task
+    _BATCHER.start()
+    if SESSION_IDLE_S > 0 and _sweeper_task is None:
+        _sweeper_task = asyncio.create_task(_sweep_idle_sessions(SESSION_IDLE_S))
+
+
+@app.on_event('shutdown')
+async def on_shutdown():
+    global _sweeper_task
+    if _sweeper_task is not None:
+        _sweeper_task.cancel()
+        try:
+            await _sweeper_task
+        except asyncio.CancelledError:
+            pass
+        _sweeper_task = None
+    await _BATCHER.stop()
+
+
+async def _submit(arr: np.ndarray):
+    """Run `arr` through the batcher on the session it holds a registry reference to."""
+    sess = _SESSIONS.acquire(MODEL_PATH)
+    if sess is None:
+        # dropped (unload or idle sweep) since the caller's check: reload it
+        _unload_session()
+        init_onnx_session()
+        sess = _SESSIONS.acquire(MODEL_PATH)
+        if sess is None:
+            raise RuntimeError('ONNX session not initialized')
+    try:
+        return await _BATCHER.submit(arr, sess)
+    finally:
+        _SESSIONS.release(MODEL_PATH)
+
+
+@app.post('/infer')
+async def infer(req: InferRequest):
+    # ensure session is initialized lazily
+    if _session is None:
+        init_onnx_session()
+    if _session is None:
+        raise HTTPException(status_code=500, detail='ONNX session not initialized')
+    arr = _to_input(req.window)
+    try:
+        out, fallback = await _submit(arr)
+    except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    # orjson serializes the ndarrays directly (OPT_SERIALIZE_NUMPY), without
+    # building a Python float per element via tolist()
+    out = [np.ascontiguousarray(o) for o in out]
+    resp = { 'probs': out[0] if len(out)>0 else None, 'output': out }
+    if fallback:
+        resp['fallback'] = fallback
+    return ORJSONResponse(resp)
+
+async def infer_bin(request: Request):
+    """Binary /infer: float32 bytes in, float32 bytes out, no JSON or pydantic.
+
+    Mounted as a plain Starlette route (see below), so FastAPI's parameter
+    parsing and response serialization are skipped as well.
+    """
+    if _session is None:
+        init_onnx_session()
+    if _session is None:
+        return PlainTextResponse('ONNX session not initialized', status_code=500)
+    body = await request.body()
+    try:
+        arr = np.frombuffer(body, dtype='<f4').reshape(_expected_shape or (1, 1, -1))
+    except ValueError as e:
+        return PlainTextResponse(f'bad float32 window ({len(body)} bytes): {e}', status_code=400)
+    try:
+        out, fallback = await _submit(arr)
+    except Exception as e:
+        return PlainTextResponse(str(e), status_code=500)
+    first = np.ascontiguousarray(out[0], dtype='<f4')
+    headers = {'X-Output-Shape': ','.join(str(d) for d in first.shape)}
+    if fallback:
+        headers['X-Fallback'] = fallback
+    return Response(content=first.tobytes(), media_type='application/octet-stream', headers=headers)
+
+
+app.router.routes.append(Route('/infer_bin', infer_bin, methods=['POST']))
+
+
+@app.post('/model/unload')
+async def model_unload():
+    """Drop the loaded session now; it is reloaded on the next request.
+
+    Runs on the event loop, like the request path, so a drop cannot land
+    between a request's session check and its registry acquire.
+    """
+    if not _SESSIONS.drop(MODEL_PATH):
+        if MODEL_PATH in _SESSIONS.paths():
+            raise HTTPException(status_code=409, detail='session in use, retry later')
+        return {'unloaded': False}
+    _unload_session()
+    return {'unloaded': True}
+
 
 @app.get('/model/status')
 def model_status():
+    global _status_cache
+    if _status_cache is not None:
+        return _status_cache
     info = {'model_path': MODEL_PATH, 'onnx_providers': [], 'onnx_provider_in_session': None}
     try:
         # try to initialize ort lazily to collect provider info
@@ -213,6 +752,9 @@ def model_status():
                     info['onnx_provider_in_session'] = None
     except Exception as e:
         info['error'] = str(e)
+    # providers only change when the session does; cache until it is unloaded
+    if _session is not None and info['onnx_provider_in_session'] is not None and 'error' not in info:
+        _status_cache = info
     return info
 
 if __name__ == '__main__':
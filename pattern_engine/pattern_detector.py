@@ -6,14 +6,17 @@ This service runs the pattern detection algorithm on streaming market data
 and publishes trading signals to Redis streams for consumption by the Strategy Engine.
 """
 import asyncio
-import redis
-import json
+import redis.asyncio as aredis
 import logging
+import multiprocessing
+import orjson
 import os
 import time
-from typing import Dict, Optional
+import zlib
+import numpy as np
+from typing import Dict, List, Optional, Tuple
 from pattern_engine.runner import run_replay, default_model_stub
-from pattern_engine.state import EMA, VWAP, Welford
+from pattern_engine import _hot
 from pattern_engine.config import cfg
 
 logging.basicConfig(level=logging.INFO)
@@ -23,111 +26,197 @@ logger = logging.getLogger(__name__)
 REDIS_URL = cfg.redis_url
 SIGNALS_STREAM = cfg.signals_stream
 TICKS_STREAM = cfg.ticks_stream
+# The publisher only writes, so stream names and field keys go out pre-encoded
+# and replies stay raw bytes (no decode_responses)
+SIGNALS_STREAM_B = SIGNALS_STREAM.encode()
+TICKS_STREAM_B = TICKS_STREAM.encode()
+_DATA_FIELD = b"data"
 
 
-def _xadd_with_retry(client, stream: str, data: dict):
-    """Attempt xadd with a small retry/backoff loop to tolerate transient errors."""
+def _xadd_cap(stream) -> dict:
+    """XADD kwargs trimming `stream` to about its configured length (MAXLEN ~):
+    cfg.ticks_stream_maxlen for the tick stream, cfg.stream_maxlen otherwise."""
+    is_ticks = stream in (TICKS_STREAM, TICKS_STREAM_B)
+    maxlen = cfg.ticks_stream_maxlen if is_ticks else cfg.stream_maxlen
+    if maxlen > 0:
+        return {"maxlen": maxlen, "approximate": True}
+    return {}
+
+
+async def _xadd_with_retry(client, stream: str, data: dict):
+    """Attempt xadd with a small retry/backoff loop to tolerate transient errors.
+
+    `client` is the redis.asyncio client; the backoff sleeps without blocking the loop.
+    """
     last_exc = None
     for attempt in range(1, cfg.redis_max_retries + 1):
         try:
-            return client.xadd(stream, data)
+            return await client.xadd(stream, data, **_xadd_cap(stream))
         except Exception as e:
             last_exc = e
             logger.warning("xadd attempt %d/%d failed for stream %s: %s", attempt, cfg.redis_max_retries, stream, e)
-            time.sleep(cfg.redis_retry_delay_seconds)
+            await asyncio.sleep(cfg.redis_retry_delay_seconds)
     # last attempt failed
     logger.error("xadd failed after %d attempts for stream %s: %s", cfg.redis_max_retries, stream, last_exc)
     raise last_exc
 
+async def _xadd_batch_with_retry(client, entries: List[Tuple[bytes, bytes]]):
+    """XADD every (stream, payload) entry in one non-transactional pipeline round trip.
+
+    Each payload is an orjson-serialized dict sent as the single `data` field,
+    the same wire format the Rust publisher uses. Retries the whole batch with
+    the same backoff settings as _xadd_with_retry.
+    """
+    last_exc = None
+    # pipe.xadd packs its arguments when called, so one fields dict is reused
+    fields = {_DATA_FIELD: b""}
+    for attempt in range(1, cfg.redis_max_retries + 1):
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                caps = {}
+                for stream, payload in entries:
+                    cap = caps.get(stream)
+                    if cap is None:
+                        cap = caps[stream] = _xadd_cap(stream)
+                    fields[_DATA_FIELD] = payload
+                    pipe.xadd(stream, fields, **cap)
+                return await pipe.execute()
+        except Exception as e:
+            last_exc = e
+            logger.warning("pipelined xadd attempt %d/%d failed (%d entries): %s", attempt, cfg.redis_max_retries, len(entries), e)
+            await asyncio.sleep(cfg.redis_retry_delay_seconds)
+    logger.error("pipelined xadd failed after %d attempts (%d entries): %s", cfg.redis_max_retries, len(entries), last_exc)
+    raise last_exc
+
+def _signal(symbol: str, timestamp: float, score: float, pattern_id: int, ema_fast: float,
+            ema_slow: float, vwap: float, volume, volatility: float) -> dict:
+    """Signal payload for a tick that fired in _hot.update_detect."""
+    return {
+        "id": f"{symbol}_{int(timestamp)}",
+        "symbol": symbol,
+        "score": score,
+        "pattern": _hot.PATTERNS[pattern_id] or "composite",
+        "timestamp": timestamp,
+        "meta": {
+            "ema_fast": ema_fast,
+            "ema_slow": ema_slow,
+            "vwap": vwap,
+            "volume": volume,
+            "volatility": volatility
+        }
+    }
+
+
+def partition_of(symbol: str, partitions: int) -> int:
+    """Stable partition index for `symbol` (CRC32, identical across processes)."""
+    return zlib.crc32(symbol.encode()) % partitions if partitions > 1 else 0
+
+
+def _detect_args() -> tuple:
+    """Config thresholds passed to the _hot kernels; read once per detector/state
+    at construction so the per-tick path doesn't go through cfg attributes.
+    The cooldown is in integer nanoseconds, like the kernels' clock."""
+    return (cfg.volume_ema_alpha, cfg.volume_spike_multiplier, cfg.signal_score_min,
+            int(cfg.signal_cooldown_seconds * 1_000_000_000))
+
+
+def _as_ns(timestamp: float) -> int:
+    """Cooldown clock value for callers that only pass a seconds timestamp."""
+    return int(timestamp * 1_000_000_000)
+
+
 class PatternDetector:
-    def __init__(self):
-        self.redis_client = redis.from_url(REDIS_URL, decode_responses=True)
-        self.symbol_states: Dict[str, 'SymbolState'] = {}
-        
+    def __init__(self, capacity: int = 64, partition_index: int = 0, partition_count: int = 1):
+        # this detector only handles symbols with partition_of(symbol) == partition_index
+        self.partition_index = partition_index
+        self.partition_count = max(1, partition_count)
+        self.detect_args = _detect_args()
+        # asyncio client on a bounded pool so publishing never blocks the event loop
+        self.redis_pool = aredis.ConnectionPool.from_url(
+            REDIS_URL, max_connections=cfg.redis_max_connections)
+        self.redis_client = aredis.Redis(connection_pool=self.redis_pool)
+        # one row of indicator state per symbol (layout in pattern_engine._hot),
+        # grown by doubling; sym_ix maps symbol -> row
+        self.state = _hot.new_states(capacity)
+        # time of each row's last signal on the cooldown clock (integer ns)
+        self.last_signal_ns = np.zeros(capacity, dtype=np.int64)
+        self.sym_ix: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        # reused for every published tick; only its serialized bytes are kept
+        self._tick_buf = {"symbol": "", "price": 0.0, "volume": 0, "timestamp": 0.0}
+        # one generator per detector; the mock feed draws a whole batch per call
+        self._rng = np.random.default_rng()
+
+    @property
+    def active_symbols(self) -> int:
+        return len(self.sym_ix)
+
+    def symbol_index(self, symbol: str) -> int:
+        """Row of `symbol` in the state table, adding one if it is new."""
+        ix = self.sym_ix.get(symbol)
+        if ix is None:
+            ix = len(self.symbols)
+            if ix == len(self.state):
+                grow = max(1, len(self.state))
+                self.state = np.concatenate([self.state, _hot.new_states(grow)])
+                self.last_signal_ns = np.concatenate([self.last_signal_ns, np.zeros(grow, dtype=np.int64)])
+            self.sym_ix[symbol] = ix
+            self.symbols.append(symbol)
+        return ix
+
+    def update_and_detect(self, ix: int, price: float, volume: float, timestamp: float,
+                          ts_ns: Optional[int] = None) -> Optional[dict]:
+        """Update row `ix` with one tick; returns a signal dict if one fires.
+
+        `timestamp` (seconds) is what the signal reports; the cooldown runs on
+        `ts_ns` (e.g. time.monotonic_ns()), defaulting to `timestamp` in ns."""
+        ts_ns = _as_ns(timestamp) if ts_ns is None else ts_ns
+        fired, score, pattern_id, ema_fast, ema_slow, vwap, volatility = _hot.update_detect(
+            self.state[ix], int(self.last_signal_ns[ix]), float(price), float(volume), ts_ns, *self.detect_args)
+        if not fired:
+            return None
+        self.last_signal_ns[ix] = ts_ns
+        return _signal(self.symbols[ix], timestamp, score, pattern_id, ema_fast, ema_slow, vwap, volume, volatility)
+
+    def update_batch(self, rows, prices, volumes, timestamp: float, ts_ns: Optional[int] = None) -> List[dict]:
+        """Update many symbols (one tick each) in a single kernel call; returns the signals raised.
+
+        Clocks as in update_and_detect."""
+        rows = np.asarray(rows, dtype=np.int64)
+        fired, out = _hot.update_detect_batch(
+            self.state, self.last_signal_ns, rows,
+            np.asarray(prices, dtype=np.float64), np.asarray(volumes, dtype=np.float64),
+            _as_ns(timestamp) if ts_ns is None else ts_ns, *self.detect_args)
+        signals = []
+        for k in np.flatnonzero(fired):
+            score, pattern_id, ema_fast, ema_slow, vwap, volatility = out[k].tolist()
+            signals.append(_signal(self.symbols[rows[k]], timestamp, score, int(pattern_id),
+                                   ema_fast, ema_slow, vwap, float(volumes[k]), volatility))
+        return signals
+
     class SymbolState:
+        """Standalone state for a single symbol (same kernel as the detector's table)."""
+
         def __init__(self, symbol: str):
             self.symbol = symbol
-            self.ema_fast = EMA(0.1)      # 10-period equivalent
-            self.ema_slow = EMA(0.05)     # 20-period equivalent
-            self.vwap = VWAP()
-            self.welford = Welford()
-            self.last_signal_time = 0
-            self.signal_cooldown = cfg.signal_cooldown_seconds
-            # adaptive average volume via EMA
-            self.avg_volume_ema = EMA(cfg.volume_ema_alpha)
-            
-        def update_and_detect(self, price: float, volume: float, timestamp: float) -> Optional[dict]:
-            """Update indicators and detect patterns"""
-            # Update all indicators
-            ema_fast = self.ema_fast.update(price)
-            ema_slow = self.ema_slow.update(price)
-            vwap_price = self.vwap.update(price, volume)
-            self.welford.update(price)
-            
-            # Pattern detection logic
-            signal_score = 0.0
-            pattern_type = None
-            
-            # EMA Crossover Pattern
-            if ema_fast and ema_slow:
-                ema_diff = (ema_fast - ema_slow) / ema_slow
-                if abs(ema_diff) > 0.01:  # 1% difference threshold
-                    signal_score += ema_diff * 2.0  # Amplify signal
-                    pattern_type = "ema_crossover"
+            self.state = _hot.new_state()
+            self.last_signal_ns: int = 0
+            self.detect_args = _detect_args()
             
-            # VWAP Deviation Pattern
-            if vwap_price:
-                vwap_diff = (price - vwap_price) / vwap_price
-                if abs(vwap_diff) > 0.005:  # 0.5% deviation threshold
-                    signal_score += vwap_diff * 1.5
-                    if not pattern_type:
-                        pattern_type = "vwap_deviation"
+        @property
+        def last_signal_time(self) -> float:
+            return self.last_signal_ns / 1e9
             
-            # Volume Spike Pattern (adaptive average via EMA)
-            if volume > 0:
-                # update EMA of volume to maintain running average
-                avg_volume = self.avg_volume_ema.update(volume)
-                # protect against zero
-                if avg_volume is None or avg_volume == 0:
-                    avg_volume = float(volume)
-                volume_ratio = volume / avg_volume
-                if volume_ratio > cfg.volume_spike_multiplier:
-                    signal_score += 0.3 if signal_score > 0 else -0.3
-                    pattern_type = "volume_spike"
-            
-            # Volatility Pattern
-            if self.welford.count > 5:
-                volatility = self.welford.std
-                price_change = abs(price - (ema_fast or price)) / price
-                if price_change > volatility * 2:  # 2 standard deviations
-                    signal_score += 0.4 if signal_score > 0 else -0.4
-                    pattern_type = "volatility_breakout"
-            
-            # Normalize signal score to [-1, 1]
-            signal_score = max(-1.0, min(1.0, signal_score))
-            
-            # Only generate signal if significant and not in cooldown
-            if (abs(signal_score) > cfg.signal_score_min and 
-                timestamp - self.last_signal_time > self.signal_cooldown):
-                
-                self.last_signal_time = timestamp
-                
-                return {
-                    "id": f"{self.symbol}_{int(timestamp)}",
-                    "symbol": self.symbol,
-                    "score": signal_score,
-                    "pattern": pattern_type or "composite",
-                    "timestamp": timestamp,
-                    "meta": {
-                        "ema_fast": ema_fast,
-                        "ema_slow": ema_slow,
-                        "vwap": vwap_price,
-                        "volume": volume,
-                        "volatility": self.welford.std if self.welford.count > 1 else 0.0
-                    }
-                }
-            
-            return None
+        def update_and_detect(self, price: float, volume: float, timestamp: float,
+                              ts_ns: Optional[int] = None) -> Optional[dict]:
+            """Update indicators and detect patterns"""
+            ts_ns = _as_ns(timestamp) if ts_ns is None else ts_ns
+            fired, score, pattern_id, ema_fast, ema_slow, vwap, volatility = _hot.update_detect(
+                self.state, self.last_signal_ns, float(price), float(volume), ts_ns, *self.detect_args)
+            if not fired:
+                return None
+            self.last_signal_ns = ts_ns
+            return _signal(self.symbol, timestamp, score, pattern_id, ema_fast, ema_slow, vwap, volume, volatility)
     
     async def process_tick_stream(self):
         """Process incoming tick data and generate signals"""
@@ -139,60 +228,58 @@ class PatternDetector:
     
     async def generate_mock_ticks(self):
         """Generate mock tick data for testing (replace with real feed)"""
-        import random
-        
-        symbols = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN"]
         base_prices = {"AAPL": 150.0, "GOOGL": 2800.0, "MSFT": 380.0, "TSLA": 250.0, "AMZN": 3400.0}
+        symbols = [s for s in base_prices if partition_of(s, self.partition_count) == self.partition_index]
+        if not symbols:
+            logger.info("Partition %d/%d has no symbols", self.partition_index, self.partition_count)
+            return
         
-        logger.info("Generating mock tick data for pattern detection")
+        logger.info("Generating mock tick data for pattern detection (partition %d/%d: %s)",
+                    self.partition_index, self.partition_count, ",".join(symbols))
         
+        rows = np.array([self.symbol_index(s) for s in symbols])
+        prices = np.array([base_prices[s] for s in symbols])
         tick_count = 0
+        period = cfg.tick_period_seconds
+        next_deadline = time.monotonic()
         while True:
-            for symbol in symbols:
-                # Generate realistic price movement
-                base_price = base_prices[symbol]
-                price_change = random.gauss(0, base_price * 0.001)  # 0.1% volatility
-                new_price = base_price + price_change
-                base_prices[symbol] = new_price
-                
-                volume = random.randint(100, 5000)
-                timestamp = time.time()
-                
-                # Update pattern detection
-                if symbol not in self.symbol_states:
-                    self.symbol_states[symbol] = self.SymbolState(symbol)
-                
-                signal = self.symbol_states[symbol].update_and_detect(
-                    new_price, volume, timestamp
-                )
-                
-                # Publish tick data
-                tick_data = {
-                    "symbol": symbol,
-                    "price": new_price,
-                    "volume": volume,
-                    "timestamp": timestamp
-                }
-                
-                try:
-                    self.redis_client.xadd(TICKS_STREAM, tick_data)
-                except Exception as e:
-                    logger.error(f"Failed to publish tick: {e}")
-                
-                # Publish signal if detected
-                if signal:
-                    try:
-                        self.redis_client.xadd(SIGNALS_STREAM, signal)
-                        logger.info(f"Signal generated: {symbol} score={signal['score']:.3f} pattern={signal['pattern']}")
-                    except Exception as e:
-                        logger.error(f"Failed to publish signal: {e}")
-                
-                tick_count += 1
-                if tick_count % 100 == 0:
-                    logger.info(f"Processed {tick_count} ticks, {len(self.symbol_states)} symbols active")
+            # Generate realistic price movement and volumes for every symbol at once
+            prices += self._rng.standard_normal(len(symbols)) * prices * 0.001  # 0.1% volatility
+            volumes = self._rng.integers(100, 5001, size=len(symbols))
+            # one wall-clock read per batch for the published timestamps; cooldowns
+            # run on the monotonic ns clock so NTP steps can't skip or repeat them
+            timestamp = time.time()
+            ts_ns = time.monotonic_ns()
+            
+            # Update pattern detection for the whole batch
+            signals = self.update_batch(rows, prices, volumes, timestamp, ts_ns)
+            
+            # every tick and signal of this batch goes out in one pipeline
+            tick = self._tick_buf
+            tick["timestamp"] = timestamp
+            entries: List[Tuple[bytes, bytes]] = []
+            for symbol, price, volume in zip(symbols, prices.tolist(), volumes.tolist()):
+                tick["symbol"] = symbol
+                tick["price"] = price
+                tick["volume"] = volume
+                entries.append((TICKS_STREAM_B, orjson.dumps(tick)))
+            for signal in signals:
+                entries.append((SIGNALS_STREAM_B, orjson.dumps(signal)))
+                logger.info(f"Signal generated: {signal['symbol']} score={signal['score']:.3f} pattern={signal['pattern']}")
+            
+            tick_count += len(symbols)
+            if tick_count % 100 == 0:
+                logger.info(f"Processed {tick_count} ticks, {self.active_symbols} symbols active")
             
-            # Wait before next tick batch
-            await asyncio.sleep(1.0)  # 1 second between batches
+            try:
+                await _xadd_batch_with_retry(self.redis_client, entries)
+            except Exception as e:
+                logger.error(f"Failed to publish tick batch: {e}")
+            
+            # Pace batches tick_period_seconds apart on the monotonic clock, so time
+            # spent detecting/publishing doesn't accumulate as drift
+            next_deadline += period
+            await asyncio.sleep(max(0.0, next_deadline - time.monotonic()))
     
     async def health_check_server(self):
         """Simple health check endpoint"""
@@ -201,9 +288,10 @@ class PatternDetector:
         async def health_handler(request):
             status = {
                 "status": "healthy",
-                "active_symbols": len(self.symbol_states),
+                "active_symbols": self.active_symbols,
                 "signals_stream": SIGNALS_STREAM,
                 "ticks_stream": TICKS_STREAM,
+                "partition": f"{self.partition_index}/{self.partition_count}",
                 "timestamp": time.time()
             }
             return web.json_response(status)
@@ -213,27 +301,61 @@ class PatternDetector:
         
         runner = web.AppRunner(app)
         await runner.setup()
-        site = web.TCPSite(runner, '0.0.0.0', 8005)
+        # one health port per partition process
+        port = 8005 + self.partition_index
+        site = web.TCPSite(runner, '0.0.0.0', port)
         await site.start()
-        logger.info("Health check server started on port 8005")
+        logger.info("Health check server started on port %d", port)
 
-async def main():
+async def main(partition_index: int = 0, partition_count: int = 1):
     """Main service entry point"""
     logger.info("Starting Pattern Engine Service")
     
-    detector = PatternDetector()
+    detector = PatternDetector(partition_index=partition_index, partition_count=partition_count)
     
     # Start health check server and pattern detection
-    await asyncio.gather(
-        detector.health_check_server(),
-        detector.process_tick_stream()
-    )
+    try:
+        await asyncio.gather(
+            detector.health_check_server(),
+            detector.process_tick_stream()
+        )
+    finally:
+        # release pooled async connections on shutdown
+        await detector.redis_client.aclose()
+        await detector.redis_pool.disconnect()
 
-if __name__ == "__main__":
+
+def _serve(partition_index: int = 0, partition_count: int = 1):
+    """Run one detector (one partition) on its own event loop."""
+    # Prefer uvloop for the Redis/HTTP socket work when it is available;
+    # lightweight dev environments fall back to the default asyncio loop.
+    try:
+        import uvloop  # type: ignore
+        uvloop.install()
+    except ImportError:
+        pass
     try:
-        asyncio.run(main())
+        asyncio.run(main(partition_index, partition_count))
     except KeyboardInterrupt:
         logger.info("Pattern Engine Service stopped")
     except Exception as e:
         logger.error(f"Pattern Engine Service failed: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+if __name__ == "__main__":
+    if cfg.partition_count <= 1:
+        _serve()
+    else:
+        # one process per partition: each owns its state table and Redis pool,
+        # so per-tick work is no longer serialized on a single GIL
+        ctx = multiprocessing.get_context("spawn")
+        procs = [ctx.Process(target=_serve, args=(i, cfg.partition_count), name=f"pattern-detector-{i}")
+                 for i in range(cfg.partition_count)]
+        for proc in procs:
+            proc.start()
+        try:
+            for proc in procs:
+                proc.join()
+        except KeyboardInterrupt:
+            logger.info("Pattern Engine Service stopped")
@@ -2,12 +2,15 @@
 
 This runner is intentionally simple: it reads newline-delimited CSV ticks
 (ts,symbol,price,volume) from stdin or a file, maintains per-symbol state
-and calls a provided model runner (TRT or stub).
+and calls a provided model runner (TRT or stub). Files are loaded and
+featurized per symbol in bulk; stdin is processed row by row.
 """
-from typing import Dict, Callable, Optional
+from typing import Dict, Callable, Iterator, Optional
 import csv
 import sys
 import logging
+import numpy as np
+from . import _hot
 from .state import EMA, VWAP, Welford
 from .trt_engine import has_tensorrt, TRTEngine
 
@@ -27,11 +30,52 @@ def default_model_stub(features):
     return float(max(-1.0, min(1.0, s)))
 
 
-def run_replay(tick_csv_path: Optional[str], model_callable: Optional[Callable] = None):
-    if model_callable is None:
-        model_callable = default_model_stub
+def _load_ticks(tick_csv_path: str):
+    """Read a whole tick CSV into columns; rows without 4 usable fields are skipped."""
+    import pandas as pd
+
+    try:
+        # C tokenizer over a memory-mapped file, parsing numbers straight to float64
+        df = pd.read_csv(tick_csv_path, header=None, names=["ts", "sym", "price", "vol"],
+                         dtype={"ts": str, "sym": str, "price": np.float64, "vol": np.float64},
+                         engine="c", memory_map=True, on_bad_lines="warn")
+    except pd.errors.EmptyDataError:
+        return None
+    bad = df.isna().any(axis=1)
+    if bad.any():
+        logger.warning("Skipping %d malformed rows", int(bad.sum()))
+        df = df[~bad]
+    return df
+
+
+def _replay_file(tick_csv_path: str, model_callable: Callable) -> Iterator[str]:
+    """Batch replay of a CSV file: features are computed per symbol in one sweep
+    (pattern_engine._hot.replay_features) instead of per-row object updates."""
+    df = _load_ticks(tick_csv_path)
+    if df is None or df.empty:
+        return
+    price = df["price"].to_numpy(np.float64)
+    vol = df["vol"].to_numpy(np.float64)
+    features = np.empty((len(df), 4), dtype=np.float64)
+    for idx in df.groupby("sym", sort=False).indices.values():
+        features[idx] = _hot.replay_features(price[idx], vol[idx])
+
+    if model_callable is default_model_stub:
+        scores = np.clip(features.sum(axis=1) / (features.shape[1] + 1e-9), -1.0, 1.0).tolist()
+    else:
+        scores = []
+        for row in features.tolist():
+            try:
+                scores.append(model_callable(row))
+            except Exception as e:
+                logger.exception("Model call failed, falling back to stub: %s", e)
+                scores.append(default_model_stub(row))
+    for ts, sym, score in zip(df["ts"].tolist(), df["sym"].tolist(), scores):
+        yield f"{ts},{sym},{score}"
+
+
+def _replay_rows(f, model_callable: Callable) -> Iterator[str]:
     states: Dict[str, SymbolState] = {}
-    f = open(tick_csv_path, "r") if tick_csv_path else sys.stdin
     reader = csv.reader(f)
     for row in reader:
         try:
@@ -54,7 +98,24 @@ def run_replay(tick_csv_path: Optional[str], model_callable: Optional[Callable]
         except Exception as e:
             logger.exception("Model call failed, falling back to stub: %s", e)
             score = default_model_stub(features)
-        print(f"{ts},{sym},{score}")
+        yield f"{ts},{sym},{score}"
+
+
+def run_replay(tick_csv_path: Optional[str], model_callable: Optional[Callable] = None) -> Iterator[str]:
+    """Yield one ``ts,symbol,score`` line per tick, in input order."""
+    if model_callable is None:
+        model_callable = default_model_stub
+    if not tick_csv_path:
+        # stdin is replayed row by row as it arrives
+        yield from _replay_rows(sys.stdin, model_callable)
+        return
+    try:
+        yield from _replay_file(tick_csv_path, model_callable)
+        return
+    except ImportError:
+        logger.warning("pandas not available; replaying %s row by row", tick_csv_path)
+    with open(tick_csv_path, "r") as f:
+        yield from _replay_rows(f, model_callable)
 
 
 if __name__ == "__main__":
@@ -69,4 +130,5 @@ if __name__ == "__main__":
             model = TRTEngine(args.model_engine).infer
         else:
             logger.warning("TensorRT missing: will use stub model")
-    run_replay(args.ticks, model)
+    for line in run_replay(args.ticks, model):
+        print(line)
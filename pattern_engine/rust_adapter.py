@@ -9,17 +9,25 @@ run a tick CSV through the preferred backend and return the output lines.
 """
 from __future__ import annotations
 
+import functools
 import os
 import shutil
 import subprocess
 import logging
-from typing import Iterable, Optional
+from types import ModuleType
+from typing import Iterable, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 _RUST_BINARY_ENV = "RUST_PATTERN_ENGINE_BIN"
+_EXTENSION_MODULES = ("pattern_engine_native", "pattern_engine_rust", "pattern_engine_pyo3", "pattern_engine_trt")
+# extensions whose `run_replay` returns a processed-row count instead of yielding lines
+_COUNT_ONLY_MODULES = ("pattern_engine_pyo3", "pattern_engine_trt")
 
 
+# Lookups below hit the filesystem (sys.path / build dirs), so each is done once
+# per process; call <fn>.cache_clear() after installing a backend at runtime.
+@functools.lru_cache(maxsize=1)
 def _find_rust_binary() -> Optional[str]:
     # 1) explicit env override
     path = os.environ.get(_RUST_BINARY_ENV)
@@ -46,19 +54,42 @@ def _find_rust_binary() -> Optional[str]:
     return None
 
 
+@functools.lru_cache(maxsize=1)
+def _extension_modules() -> Tuple[ModuleType, ...]:
+    """Import whichever pyo3 extension modules are available."""
+    found = []
+    for name in _EXTENSION_MODULES:
+        try:
+            found.append(__import__(name))
+            logger.debug("Found rust extension module: %s", name)
+        except Exception:
+            continue
+    return tuple(found)
+
+
+def _rust_module() -> Optional[ModuleType]:
+    """First available extension exposing a compatible `run_replay`."""
+    for mod in _extension_modules():
+        if mod.__name__ not in _COUNT_ONLY_MODULES and hasattr(mod, "run_replay"):
+            return mod
+    return None
+
+
+def _publish_module() -> Optional[ModuleType]:
+    """First available extension exposing `run_replay_publish(ticks_csv, redis_url)`."""
+    for mod in _extension_modules():
+        if hasattr(mod, "run_replay_publish"):
+            return mod
+    return None
+
+
 def has_rust_extension() -> bool:
     """Return True if a pyo3-based native extension is importable.
 
-    We try common names but projects vary; keep this conservative.
+    We try common names (including the `pattern_engine_pyo3` wrapper) but
+    projects vary; keep this conservative.
     """
-    for mod in ("pattern_engine_native", "pattern_engine_rust", "pattern_engine_trt"):
-        try:
-            __import__(mod)
-            logger.debug("Found rust extension module: %s", mod)
-            return True
-        except Exception:
-            continue
-    return False
+    return bool(_extension_modules())
 
 
 def has_rust_binary() -> bool:
@@ -93,24 +124,17 @@ def replay(ticks_csv: Optional[str] = None, prefer_rust: bool = True) -> Iterabl
     """Replay ticks through the preferred backend.
 
     If `prefer_rust` is True this will try, in order:
-      1. pyo3 Rust extension import (not implemented here, but detected),
+      1. pyo3 Rust extension (its `run_replay` generator),
       2. Rust binary (CLI),
       3. Python `pattern_engine.runner.run_replay` fallback.
 
     It yields the lines produced by the selected backend for easy piping.
     """
-    # 1) pyo3 extension (not implemented directly — detect only)
-    if prefer_rust and has_rust_extension():
-        # If a pyo3 extension is available we assume it exposes a `run_replay`
-        # function compatible with the Python wrapper. Import and delegate.
-        try:
-            mod = __import__("pattern_engine_native")
-        except Exception:
-            try:
-                mod = __import__("pattern_engine_rust")
-            except Exception:
-                mod = None
-        if mod is not None and hasattr(mod, "run_replay"):
+    # 1) pyo3 extension: delegate to its `run_replay`, which yields the same
+    #    lines as the Python runner
+    if prefer_rust:
+        mod = _rust_module()
+        if mod is not None:
             for out in mod.run_replay(ticks_csv):
                 yield out
             return
@@ -121,21 +145,26 @@ def replay(ticks_csv: Optional[str] = None, prefer_rust: bool = True) -> Iterabl
             yield ln
         return
 
-    # 3) Python fallback
+    # 3) Python fallback: run_replay is a generator, so no subprocess is needed
     from pattern_engine.runner import run_replay
 
-    # run_replay prints to stdout; capture by running it and yielding print lines
-    # We'll call it directly but capture printed output using subprocess is heavier.
-    # Simpler: run it in a subprocess invoking python -m pattern_engine.runner
-    cmd = [shutil.which("python3") or shutil.which("python") or "python", "-m", "pattern_engine.runner"]
-    if ticks_csv:
-        cmd += ["--ticks", ticks_csv]
-    logger.info("Running Python runner: %s", cmd)
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    assert proc.stdout is not None
-    for line in proc.stdout:
-        yield line.rstrip("\n")
-    rc = proc.wait()
-    if rc != 0:
-        stderr = proc.stderr.read() if proc.stderr is not None else ""
-        raise RuntimeError(f"Python runner exited {rc}: {stderr}")
+    logger.info("Running Python runner in-process for %s", ticks_csv or "stdin")
+    yield from run_replay(ticks_csv)
+
+
+def replay_publish(ticks_csv: Optional[str], redis_url: Optional[str] = None, prefer_rust: bool = True) -> int:
+    """Replay a tick CSV and publish it to `redis_url`; returns the processed tick count.
+
+    With `prefer_rust`, the pyo3 extension's `run_replay_publish` runs in this
+    process (the GIL is released while it works). Without an extension only a
+    dry run is possible: with no `redis_url` this counts the lines of `replay`,
+    otherwise RuntimeError is raised rather than silently not publishing.
+    """
+    if prefer_rust:
+        mod = _publish_module()
+        if mod is not None:
+            return mod.run_replay_publish(ticks_csv, redis_url)
+
+    if redis_url:
+        raise RuntimeError("No pyo3 extension with run_replay_publish; cannot publish to Redis")
+    return sum(1 for _ in replay(ticks_csv, prefer_rust=prefer_rust))
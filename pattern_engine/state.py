@@ -7,6 +7,7 @@ Includes:
 
 These are small, well-tested algorithms suitable for the pattern engine.
 """
+import math
 from typing import Optional
 
 
@@ -42,6 +43,8 @@ class Welford:
         self.count = 0
         self.mean = 0.0
         self.m2 = 0.0
+        # sample std, recomputed once per update rather than on every read
+        self.std = 0.0
 
     def update(self, x: float):
         self.count += 1
@@ -49,13 +52,10 @@ class Welford:
         self.mean += delta / self.count
         delta2 = x - self.mean
         self.m2 += delta * delta2
+        self.std = 0.0 if self.count < 2 else math.sqrt(self.m2 / (self.count - 1))
 
     @property
     def variance(self) -> float:
         if self.count < 2:
             return 0.0
         return self.m2 / (self.count - 1)
-
-    @property
-    def std(self) -> float:
-        return self.variance ** 0.5
@@ -9,8 +9,14 @@ from typing import Optional
 import os
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# Replay each input shape's copies + enqueue as a captured CUDA graph after the
+# first call (TRT_CUDA_GRAPH=0 keeps the plain per-call enqueue)
+CUDA_GRAPHS = os.environ.get("TRT_CUDA_GRAPH", "1").lower() not in ("0", "false", "no")
+
 def has_tensorrt() -> bool:
     """Check for TensorRT bindings lazily.
 
@@ -35,6 +41,12 @@ class TRTEngine:
         if not has_tensorrt():
             raise RuntimeError("TensorRT bindings not available in this environment")
         self.engine_path = engine_path
+        # per input-shape buffers and graph, see _build_plan
+        self._captured_graph = {}
+        # binding index -> (device allocation, capacity in bytes), grown on demand
+        self._dev_buf = {}
+        # binding index -> flat pinned host buffer, grown on demand
+        self._host_buf = {}
         self._load_engine()
 
     def _load_engine(self):
@@ -54,156 +66,111 @@ class TRTEngine:
         # create an execution context
         self.context = self.engine.create_execution_context()
 
-        # collect binding metadata and index by name for convenience
-        self.bindings = []
+        # CUDA driver + the engine's stream, set up once so infer() only copies and
+        # enqueues; without PyCUDA the engine still loads and infer() raises
+        try:
+            import pycuda.autoinit  # type: ignore  # noqa: F401
+            import pycuda.driver as cuda  # type: ignore
+            self._cuda = cuda
+            self._stream = cuda.Stream()
+        except Exception as e:
+            logger.warning("PyCUDA not available, TRTEngine.infer will fail: %s", e)
+            self._cuda = None
+            self._stream = None
+
+        # binding metadata as parallel per-index arrays (no per-call dict lookups);
+        # binding_map resolves a name to its index
+        n = self.engine.num_bindings
+        self.binding_names = []
+        self.binding_dtypes = []
+        self.binding_shapes = []
+        self.binding_dynamic = []
+        self.binding_nbytes_static = []
+        self.binding_is_input = np.zeros(n, dtype=bool)
         self.binding_map = {}
-        self.input_binding_idxs = []
-        self.output_binding_idxs = []
-        for i in range(self.engine.num_bindings):
+        for i in range(n):
             name = self.engine.get_binding_name(i)
-            is_input = self.engine.binding_is_input(i)
-            dtype = trt.nptype(self.engine.get_binding_dtype(i))
+            dtype = np.dtype(trt.nptype(self.engine.get_binding_dtype(i)))
             # try to get static binding shape; for dynamic shapes, context can provide shape
             try:
-                shape = tuple(self.engine.get_binding_shape(i))
+                shape = tuple(int(s) for s in self.engine.get_binding_shape(i))
             except Exception:
                 shape = None
-            meta = {
-                "index": i,
-                "name": name,
-                "is_input": is_input,
-                "dtype": dtype,
-                "shape": shape,
-            }
-            self.bindings.append(meta)
-            self.binding_map[name] = meta
-            if is_input:
-                self.input_binding_idxs.append(i)
-            else:
-                self.output_binding_idxs.append(i)
+            dynamic = shape is None or any(s in (0, -1) for s in shape)
+            self.binding_names.append(name)
+            self.binding_dtypes.append(dtype)
+            self.binding_shapes.append(shape)
+            self.binding_dynamic.append(dynamic)
+            self.binding_nbytes_static.append(None if dynamic else int(np.prod(shape)) * dtype.itemsize)
+            self.binding_is_input[i] = self.engine.binding_is_input(i)
+            self.binding_map[name] = i
+        self.input_binding_idxs = [int(i) for i in np.flatnonzero(self.binding_is_input)]
+        self.output_binding_idxs = [int(i) for i in np.flatnonzero(~self.binding_is_input)]
 
     def infer(self, inputs):
         """Run inference.
 
         `inputs` may be a single numpy array (for single-input engines) or a
         mapping {input_name: numpy_array} for models with multiple inputs.
+        Inputs are copied into pinned buffers; C-contiguous arrays already in
+        the binding dtype make that a plain memcpy.
 
         The implementation will try PyCUDA first and fall back to an informative
-        error if no CUDA buffer backend is available.
+        error if no CUDA buffer backend is available. Buffers are kept per input
+        shape, and from the second call on a shape's copies + enqueue are replayed
+        as a captured CUDA graph (see CUDA_GRAPHS).
         """
-        import numpy as np
-
         # Normalize inputs into a mapping of binding index -> host array
         if isinstance(inputs, dict):
             input_map = {}
             for name, arr in inputs.items():
-                if name not in self.binding_map:
+                idx = self.binding_map.get(name)
+                if idx is None:
                     raise RuntimeError(f"Unknown input binding name: {name}")
-                meta = self.binding_map[name]
-                if not meta['is_input']:
+                if not self.binding_is_input[idx]:
                     raise RuntimeError(f"Binding {name} is not marked as input")
-                input_map[meta['index']] = np.ascontiguousarray(arr)
+                input_map[idx] = np.asarray(arr)
         else:
             # single-array case: require exactly one input binding
             if len(self.input_binding_idxs) != 1:
                 raise RuntimeError("TRTEngine.infer requires a mapping for multi-input models")
             in_idx = self.input_binding_idxs[0]
-            input_map = {in_idx: np.ascontiguousarray(inputs)}
+            input_map = {in_idx: np.asarray(inputs)}
 
         # attempt PyCUDA-backed path
         try:
-            import pycuda.autoinit  # type: ignore
-            import pycuda.driver as cuda  # type: ignore
-
-            # create a CUDA stream for async execution
-            stream = cuda.Stream()
-
-            # allocate device buffers for all bindings we will use
-            device_ptrs = [0] * self.engine.num_bindings
-            host_outputs = {}
-
-            # input allocations
+            if self._cuda is None:
+                raise RuntimeError("PyCUDA not available")
+            # captured graphs are replayed on the engine's one stream
+            stream = self._stream
+
+            # buffers (and the captured graph) are reused for every call with the same input shapes
+            key = tuple((idx, tuple(int(s) for s in arr.shape)) for idx, arr in sorted(input_map.items()))
+            plan = self._captured_graph.get(key)
+            if plan is None:
+                plan = self._captured_graph[key] = self._build_plan(input_map)
+            # write inputs straight into the pinned buffers, casting to the binding
+            # dtype on the way (no intermediate astype/ascontiguousarray copy)
             for idx, h_arr in input_map.items():
-                # coerce dtype to expected (safe cast)
-                expected_dtype = self.bindings[idx]['dtype']
-                if h_arr.dtype != expected_dtype:
-                    try:
-                        h_arr = h_arr.astype(expected_dtype)
-                    except Exception:
-                        raise RuntimeError(f"Cannot coerce input dtype {h_arr.dtype} to expected {expected_dtype} for binding index {idx}")
-
-                # handle dynamic binding shapes: set binding shape on context if network expects
-                meta = self.bindings[idx]
-                provided_shape = tuple(int(s) for s in h_arr.shape)
-                if meta['shape'] is None or any((ms in (0, -1)) for ms in meta['shape'] or []):
-                    # set concrete shape for dynamic binding
-                    try:
-                        self.context.set_binding_shape(idx, provided_shape)
-                    except Exception as e:
-                        raise RuntimeError(f"Failed to set dynamic binding shape for index {idx}: {e}")
-                else:
-                    # validate static shape compatibility
-                    static_shape = tuple(int(s) for s in meta['shape'])
-                    if len(static_shape) != len(provided_shape) or any((ms != ps) for ms, ps in zip(static_shape, provided_shape)):
-                        raise RuntimeError(f"Input shape {provided_shape} incompatible with engine binding shape {static_shape} for binding index {idx}")
-
-                dptr = cuda.mem_alloc(h_arr.nbytes)
-                cuda.memcpy_htod_async(dptr, h_arr, stream)
-                device_ptrs[idx] = int(dptr)
-
-            # output allocations for all outputs
-            for meta in self.bindings:
-                if not meta['is_input']:
-                    bidx = meta['index']
-                    # resolve shape (dynamic shapes consulted from context)
-                    shape = meta['shape']
-                    try:
-                        # after possible set_binding_shape calls above, context can provide concrete shapes
-                        ctx_shape = tuple(self.context.get_binding_shape(bidx))
-                        # if ctx_shape contains -1 or 0, fall back to meta['shape'] or 1s
-                        if any(int(s) <= 0 for s in ctx_shape):
-                            raise ValueError("context shape incomplete")
-                        shape = ctx_shape
-                    except Exception:
-                        if shape is None:
-                            # fall back to a conservative 1-element shape
-                            shape = (1,)
-
-                    # replace unknown dims with 1
-                    shape = tuple(max(1, int(s)) for s in shape)
-                    h_out = np.empty(shape, dtype=meta['dtype'])
-                    d_out = cuda.mem_alloc(h_out.nbytes)
-                    device_ptrs[bidx] = int(d_out)
-                    host_outputs[bidx] = (h_out, d_out)
-
-            # prepare bindings list for execution
-            bindings = [0] * self.engine.num_bindings
-            for i, v in enumerate(device_ptrs):
-                bindings[i] = v
-
-            # execute asynchronously
-            try:
-                # use v2 async if available
-                if hasattr(self.context, 'execute_async_v2'):
-                    self.context.execute_async_v2(bindings, stream.handle)
-                else:
-                    # fall back to synchronous execute_v2
-                    self.context.execute_v2(bindings)
-            except Exception as e:
-                raise RuntimeError(f"TensorRT execution failed: {e}")
-
-            # copy outputs back
-            results_by_idx = {}
-            for bidx, (h_out, d_out) in host_outputs.items():
-                cuda.memcpy_dtoh_async(h_out, d_out, stream)
-                results_by_idx[bidx] = h_out
-
+                try:
+                    np.copyto(plan['host'][idx], h_arr, casting='unsafe')
+                except (TypeError, ValueError):
+                    raise RuntimeError(f"Cannot coerce input dtype {h_arr.dtype} to expected {plan['host'][idx].dtype} for binding index {idx}")
+
+            graph = plan['graph']
+            if graph:
+                graph.launch(stream)
+            else:
+                self._enqueue(plan)
             # synchronize stream to ensure copies finished
             stream.synchronize()
+            if graph is None:
+                # the direct run above doubled as the warm-up; record it for replay
+                plan['graph'] = self._capture(plan)
 
-            # assemble outputs in engine binding order (ascending index)
-            output_indices = [m['index'] for m in self.bindings if not m['is_input']]
-            outputs = [results_by_idx[idx] for idx in sorted(output_indices)]
+            # outputs in engine binding order (ascending index); copied because the
+            # pinned buffers are overwritten by the next call
+            outputs = [plan['host'][idx].copy() for idx in plan['outputs']]
 
             # return single-array result for single-output engines, else list in binding order
             if len(outputs) == 1:
@@ -219,13 +186,160 @@ class TRTEngine:
             except Exception:
                 raise RuntimeError("No usable CUDA buffer backend available (install pycuda or implement cuda-python fallback)")
 
+    def _build_plan(self, input_map):
+        """Pinned host buffers, device allocations and bindings for one set of input shapes."""
+        host, dynamic = {}, {}
+        for idx, h_arr in input_map.items():
+            # handle dynamic binding shapes: set binding shape on context if network expects
+            provided_shape = tuple(int(s) for s in h_arr.shape)
+            if self.binding_dynamic[idx]:
+                # set concrete shape for dynamic binding
+                try:
+                    self.context.set_binding_shape(idx, provided_shape)
+                except Exception as e:
+                    raise RuntimeError(f"Failed to set dynamic binding shape for index {idx}: {e}")
+                dynamic[idx] = provided_shape
+            else:
+                # validate static shape compatibility
+                static_shape = self.binding_shapes[idx]
+                if static_shape != provided_shape:
+                    raise RuntimeError(f"Input shape {provided_shape} incompatible with engine binding shape {static_shape} for binding index {idx}")
+            host[idx] = self._get_host_buf(idx, provided_shape, self.binding_dtypes[idx])
+
+        # output allocations for all outputs
+        for bidx in self.output_binding_idxs:
+            # resolve shape (dynamic shapes consulted from context)
+            shape = self.binding_shapes[bidx]
+            try:
+                # after possible set_binding_shape calls above, context can provide concrete shapes
+                ctx_shape = tuple(self.context.get_binding_shape(bidx))
+                # if ctx_shape contains -1 or 0, fall back to the engine shape or 1s
+                if any(int(s) <= 0 for s in ctx_shape):
+                    raise ValueError("context shape incomplete")
+                shape = ctx_shape
+            except Exception:
+                if shape is None:
+                    # fall back to a conservative 1-element shape
+                    shape = (1,)
+
+            # replace unknown dims with 1
+            shape = tuple(max(1, int(s)) for s in shape)
+            host[bidx] = self._get_host_buf(bidx, shape, self.binding_dtypes[bidx])
+
+        device = {idx: self._get_dev_buf(idx, h_buf.nbytes) for idx, h_buf in host.items()}
+        bindings = [0] * self.engine.num_bindings
+        for idx, d_buf in device.items():
+            bindings[idx] = int(d_buf)
+        return {
+            "inputs": sorted(input_map),
+            "outputs": self.output_binding_idxs,
+            "dynamic": dynamic,
+            "host": host,
+            "device": device,
+            "bindings": bindings,
+            # None until captured after the first run; False when graphs are off or unsupported
+            "graph": None if CUDA_GRAPHS else False,
+        }
+
+    def _get_host_buf(self, idx, shape, dtype):
+        """Pinned (page-locked) host view of `shape` for binding `idx`.
+
+        Pageable buffers make memcpy_*_async synchronous, so every binding gets one
+        pagelocked buffer sized to the largest shape seen; plans use views of it.
+        Growing it drops the cached plans, as in _get_dev_buf.
+        """
+        size = int(np.prod(shape))
+        buf = self._host_buf.get(idx)
+        if buf is None or buf.size < size:
+            if buf is not None:
+                self._captured_graph.clear()
+            buf = self._host_buf[idx] = self._cuda.pagelocked_empty(max(1, size), dtype)
+        return buf[:size].reshape(shape)
+
+    def _get_dev_buf(self, idx, nbytes):
+        """Device buffer of at least `nbytes` for binding `idx`, shared by every plan.
+
+        Reallocates only when a larger shape shows up; cached plans then point at
+        the freed buffer (bindings and captured graphs), so they are dropped and
+        rebuilt on their next call.
+        """
+        buf = self._dev_buf.get(idx)
+        if buf is not None and nbytes <= buf[1]:
+            return buf[0]
+        if buf is not None:
+            self._captured_graph.clear()
+            buf[0].free()
+        alloc = self._cuda.mem_alloc(max(1, nbytes))
+        self._dev_buf[idx] = (alloc, nbytes)
+        return alloc
+
+    def __del__(self):
+        for alloc, _ in getattr(self, '_dev_buf', {}).values():
+            try:
+                alloc.free()
+            except Exception:
+                pass
+
+    def _enqueue(self, plan):
+        """htod copies, TRT enqueue and dtoh copies for `plan` on the engine stream (no sync)."""
+        cuda, stream = self._cuda, self._stream
+        # another plan may have changed the context's dynamic shapes since
+        for idx, shape in plan['dynamic'].items():
+            self.context.set_binding_shape(idx, shape)
+        for idx in plan['inputs']:
+            cuda.memcpy_htod_async(plan['device'][idx], plan['host'][idx], stream)
+
+        # execute asynchronously
+        try:
+            # use v2 async if available
+            if hasattr(self.context, 'execute_async_v2'):
+                self.context.execute_async_v2(plan['bindings'], stream.handle)
+            else:
+                # fall back to synchronous execute_v2
+                self.context.execute_v2(plan['bindings'])
+        except Exception as e:
+            raise RuntimeError(f"TensorRT execution failed: {e}")
+
+        # copy outputs back
+        for idx in plan['outputs']:
+            cuda.memcpy_dtoh_async(plan['host'][idx], plan['device'][idx], stream)
 
-def build_engine(onnx_path: str, engine_path: str, max_workspace_size: int = 1 << 30, fp16: bool = False):
+    def _capture(self, plan):
+        """Record `plan`'s copies + enqueue on the engine stream as an instantiated CUDA graph.
+
+        Replaying the graph skips the per-call launch/API overhead. Returns False
+        (direct enqueue from then on) when the PyCUDA build or context can't capture.
+        """
+        stream = self._stream
+        if not hasattr(stream, 'begin_capture') or not hasattr(self.context, 'execute_async_v2'):
+            return False
+        try:
+            mode = getattr(getattr(self._cuda, 'capture_mode', None), 'THREAD_LOCAL', None)
+            if mode is None:
+                stream.begin_capture()
+            else:
+                stream.begin_capture(mode)
+            try:
+                self._enqueue(plan)
+            finally:
+                graph = stream.end_capture()
+            return graph.instantiate()
+        except Exception as e:
+            logger.info("CUDA graph capture unavailable, using direct enqueue: %s", e)
+            return False
+
+
+def build_engine(onnx_path: str, engine_path: str, max_workspace_size: int = 1 << 30, fp16: bool = False,
+                 max_batch: int = 0, opt_batch: int = 0):
     """Build a TensorRT engine from an ONNX model.
 
     This function requires the `tensorrt` Python bindings. It is intentionally
     small and suitable for small models; for production use consider adding
     more robust error handling and builder flags.
+
+    With `max_batch` > 0, inputs with a dynamic leading (batch) dimension get
+    an optimization profile covering batch 1..max_batch, tuned for `opt_batch`
+    (defaults to max_batch), so many windows can be stacked into one enqueue.
     """
     if not has_tensorrt():
         raise RuntimeError("tensorrt Python bindings are required to build TRT engines")
@@ -268,6 +382,21 @@ def build_engine(onnx_path: str, engine_path: str, max_workspace_size: int = 1 <
         except Exception:
             logger.warning("FP16 flag not available on this TensorRT build; continuing without FP16")
 
+    if max_batch > 0:
+        opt = min(max(1, opt_batch or max_batch), max_batch)
+        profile = builder.create_optimization_profile()
+        for i in range(network.num_inputs):
+            tensor = network.get_input(i)
+            shape = tuple(tensor.shape)
+            if not shape or shape[0] != -1:
+                continue
+            rest = shape[1:]
+            if any(d < 0 for d in rest):
+                raise RuntimeError(f"Input {tensor.name} has dynamic non-batch dims {shape}; only the batch dim may be dynamic")
+            profile.set_shape(tensor.name, (1,) + rest, (opt,) + rest, (max_batch,) + rest)
+            logger.info("Batch profile for %s: 1..%d (opt %d) x %s", tensor.name, max_batch, opt, rest)
+        config.add_optimization_profile(profile)
+
     # build engine
     engine = builder.build_engine(network, config)
     if engine is None:
@@ -2,11 +2,11 @@ import numpy as np
 from pattern_engine.trt_engine import TRTEngine, has_tensorrt
 print("has_tensorrt=", has_tensorrt())
 eng = TRTEngine("models/toy_cnn.engine")
-print('engine loaded, bindings:', eng.bindings)
+print('engine loaded, bindings:', eng.binding_names)
 inp_idx = eng.input_binding_idxs[0]
-shape = eng.bindings[inp_idx]['shape'] or (1,1)
+shape = eng.binding_shapes[inp_idx] or (1,1)
 print('input shape', shape)
-dummy = np.ones(tuple(max(1,int(s)) for s in shape), dtype=eng.bindings[inp_idx]['dtype'])
+dummy = np.ones(tuple(max(1,int(s)) for s in shape), dtype=eng.binding_dtypes[inp_idx])
 try:
     out = eng.infer(dummy)
     print('inference output shape', out.shape)
@@ -11,9 +11,11 @@ Notes:
 - Provide symbols as comma-separated tickers (with .NS suffix) or a file with one ticker per line via --symbols-file.
 - yfinance supports 1m interval for up to 7 days history. If 1m is not available, try 5m.
 - The script computes: mid, sma5/10/20, ema12/26, rsi14, atr14, bollinger(20), vol20
+- Symbols are downloaded concurrently (bounded by --concurrency); output order follows the input order.
 
 """
 import argparse
+import asyncio
 import os
 import sys
 from datetime import datetime, timedelta
@@ -71,8 +73,11 @@ def download_and_process(symbol: str, period_days: int, interval: str) -> pd.Dat
     # yfinance period parameter like '5d'
     period = f"{period_days}d"
     print('Downloading', symbol, 'period', period, 'interval', interval)
-    # use yf.download (returns OHLCV dataframe indexed by datetime)
-    df = yf.download(tickers=symbol, period=period, interval=interval, progress=False, threads=True)
+    # use yf.download (returns OHLCV dataframe indexed by datetime). Single
+    # ticker per call and symbols are already fanned out by download_all, so
+    # yfinance's own thread pool is skipped; pre/post-market bars aren't used.
+    df = yf.download(tickers=symbol, period=period, interval=interval, progress=False,
+                     threads=False, prepost=False)
     if df is None or df.empty:
         print('No data for', symbol)
         return pd.DataFrame()
@@ -93,19 +98,43 @@ def download_and_process(symbol: str, period_days: int, interval: str) -> pd.Dat
         print('Missing expected OHLCV columns for', symbol, 'got:', list(df.columns))
         return pd.DataFrame()
 
-    df = compute_indicators(df)
+    # drop extra columns (e.g. Adj Close) before compute_indicators copies the frame
+    df = compute_indicators(df[['Open', 'High', 'Low', 'Close', 'Volume']])
     df['symbol'] = symbol
     # drop rows without mid
     df = df.dropna(subset=['mid'])
     return df
 
 
+async def download_all(symbols, period_days: int, interval: str, concurrency: int):
+    """Run the blocking per-symbol downloads in worker threads, at most `concurrency` at once.
+
+    Results come back in the same order as `symbols`; a failed symbol yields an
+    empty DataFrame instead of aborting the whole run.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(sym):
+        async with sem:
+            return await asyncio.to_thread(download_and_process, sym, period_days, interval)
+
+    results = await asyncio.gather(*[one(s) for s in symbols], return_exceptions=True)
+    dfs = []
+    for sym, res in zip(symbols, results):
+        if isinstance(res, Exception):
+            print('Download failed for', sym, ':', res)
+            res = pd.DataFrame()
+        dfs.append(res)
+    return dfs
+
+
 def main():
     p = argparse.ArgumentParser()
     p.add_argument('--symbols', default='')
     p.add_argument('--symbols-file', default='')
     p.add_argument('--days', type=int, default=5)
     p.add_argument('--interval', default='1m')
+    p.add_argument('--concurrency', type=int, default=16, help='max parallel symbol downloads')
     p.add_argument('--out', default='data/nse_midcap/features.parquet')
     args = p.parse_args()
 
@@ -122,11 +151,8 @@ def main():
         print('No symbols provided. Provide --symbols or --symbols-file with .NS tickers (e.g. "MUTHOOTFIN.NS").')
         sys.exit(2)
 
-    all_dfs = []
-    for sym in symbols:
-        df = download_and_process(sym, args.days, args.interval)
-        if not df.empty:
-            all_dfs.append(df)
+    dfs = asyncio.run(download_all(symbols, args.days, args.interval, args.concurrency))
+    all_dfs = [df for df in dfs if not df.empty]
 
     if not all_dfs:
         print('No data downloaded for any symbol')
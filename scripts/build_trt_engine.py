@@ -6,6 +6,7 @@ otherwise prints instructions. It supports serialization of an engine file.
 
 Usage:
   python3 scripts/build_trt_engine.py --onnx models/toy_cnn.onnx --engine models/toy_cnn.plan --max_workspace=1G --fp16
+  python3 scripts/build_trt_engine.py --onnx models/toy_mlp.onnx --engine models/toy_mlp.plan --max_batch=64 --opt_batch=16
 
 Note: Requires TensorRT python bindings (tensorrt) available in the environment.
 """
@@ -60,6 +61,9 @@ if __name__ == '__main__':
     p.add_argument('--engine', required=True)
     p.add_argument('--max_workspace', default='1G')
     p.add_argument('--fp16', action='store_true')
+    p.add_argument('--max_batch', type=int, default=0,
+                   help='add a dynamic-batch optimization profile up to this batch (0 = none)')
+    p.add_argument('--opt_batch', type=int, default=0, help='batch size the profile is tuned for (default: max_batch)')
     args = p.parse_args()
 
     if not has_tensorrt():
@@ -79,7 +83,8 @@ if __name__ == '__main__':
     # Prefer centralized builder if pattern_engine exposes it
     try:
         from pattern_engine.trt_engine import build_engine as pattern_build  # type: ignore
-        pattern_build(args.onnx, args.engine, max_workspace_size=ws, fp16=args.fp16)
+        pattern_build(args.onnx, args.engine, max_workspace_size=ws, fp16=args.fp16,
+                      max_batch=args.max_batch, opt_batch=args.opt_batch)
     except Exception:
         # Fall back to local builder implementation (requires tensorrt)
         build_engine(args.onnx, args.engine, max_workspace_size=ws, fp16=args.fp16)
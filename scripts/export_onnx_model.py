@@ -59,7 +59,9 @@ def train_and_export(path=os.path.join(OUT_DIR, "toy_cnn.onnx")):
     # export to ONNX
     model.eval()
     dummy = torch.randn(1, 1, WINDOW)
-    torch.onnx.export(model, dummy, path, opset_version=13, input_names=["input"], output_names=["output"])    
+    # dynamic batch axis so the ONNX runner can stack concurrent windows into one run
+    torch.onnx.export(model, dummy, path, opset_version=13, input_names=["input"], output_names=["output"],
+                      dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}})
     print("exported", path)
 
 
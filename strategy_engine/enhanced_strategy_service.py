@@ -6,8 +6,9 @@ Connects to ONNX Runner, Sentiment Engine, and Mock MCP for comprehensive analys
 """
 import asyncio
 import redis
+import redis.asyncio as aredis
 import os
-import json
+import orjson
 import uuid
 import logging
 from typing import Dict, List, Optional, Any
@@ -40,7 +41,8 @@ class EnhancedStrategyEngine:
     """Enhanced Strategy Engine with ML integration"""
     
     def __init__(self):
-        self.redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+        # asyncio client: stream reads/acks/publishes must not block the event loop
+        self.redis_client = aredis.from_url(REDIS_URL, decode_responses=True)
         self.calculator = get_calculator()
         self.ml_manager = MLServiceManager()
         
@@ -67,7 +69,7 @@ class EnhancedStrategyEngine:
             # Create consumer groups
             for stream in [SIGNALS_STREAM, FILLS_STREAM, TICKS_STREAM]:
                 try:
-                    self.redis_client.xgroup_create(stream, self.consumer_group, id='0', mkstream=True)
+                    await self.redis_client.xgroup_create(stream, self.consumer_group, id='0', mkstream=True)
                     logger.info(f"Created consumer group {self.consumer_group} for {stream}")
                 except redis.exceptions.ResponseError as e:
                     if "BUSYGROUP" not in str(e):
@@ -321,7 +323,9 @@ class EnhancedStrategyEngine:
     async def publish_order(self, order: Dict):
         """Publish order to execution engine"""
         try:
-            self.redis_client.xadd(ORDERS_STREAM, order)
+            # serialized once into a single `data` field (the nested `factors`
+            # dict can't go out as flat stream fields), same format as signals
+            await self.redis_client.xadd(ORDERS_STREAM, {"data": orjson.dumps(order)})
             logger.info(f"Published order {order['id']} for {order['symbol']}")
             
             # Update leaderboard
@@ -382,7 +386,7 @@ class EnhancedStrategyEngine:
         while True:
             try:
                 # Read from signals stream
-                messages = self.redis_client.xreadgroup(
+                messages = await self.redis_client.xreadgroup(
                     self.consumer_group,
                     self.consumer_name,
                     {SIGNALS_STREAM: '>'},
@@ -390,11 +394,19 @@ class EnhancedStrategyEngine:
                     block=1000  # 1 second timeout
                 )
                 
+                # processed ids are acknowledged together, one XACK per read batch
+                acked = []
                 for stream_name, msgs in messages:
                     for msg_id, fields in msgs:
                         try:
                             # Process signal
-                            signal = dict(fields)
+                            # pattern engines (Python and Rust) send the signal as one JSON `data` field
+                            if 'data' in fields:
+                                signal = orjson.loads(fields['data'])
+                            else:
+                                signal = dict(fields)
+                                if isinstance(signal.get('meta'), (str, bytes)):
+                                    signal['meta'] = orjson.loads(signal['meta'])
                             self.stats["signals_processed"] += 1
                             
                             # Enhanced decision making
@@ -403,12 +415,13 @@ class EnhancedStrategyEngine:
                             if order:
                                 await self.publish_order(order)
                             
-                            # Acknowledge message
-                            self.redis_client.xack(SIGNALS_STREAM, self.consumer_group, msg_id)
+                            acked.append(msg_id)
                             
                         except Exception as e:
                             logger.error(f"Error processing signal {msg_id}: {e}")
                             self.stats["errors"] += 1
+                if acked:
+                    await self.redis_client.xack(SIGNALS_STREAM, self.consumer_group, *acked)
                 
                 # Log stats periodically
                 if self.stats["signals_processed"] % 50 == 0:
@@ -424,7 +437,7 @@ class EnhancedStrategyEngine:
         
         while True:
             try:
-                messages = self.redis_client.xreadgroup(
+                messages = await self.redis_client.xreadgroup(
                     self.consumer_group,
                     self.consumer_name,
                     {FILLS_STREAM: '>'},
@@ -432,15 +445,18 @@ class EnhancedStrategyEngine:
                     block=2000
                 )
                 
+                acked = []
                 for stream_name, msgs in messages:
                     for msg_id, fields in msgs:
                         try:
                             fill = dict(fields)
                             await self.process_fill(fill)
-                            self.redis_client.xack(FILLS_STREAM, self.consumer_group, msg_id)
+                            acked.append(msg_id)
                             
                         except Exception as e:
                             logger.error(f"Error processing fill {msg_id}: {e}")
+                if acked:
+                    await self.redis_client.xack(FILLS_STREAM, self.consumer_group, *acked)
                             
             except Exception as e:
                 logger.error(f"Fill stream processing error: {e}")
@@ -518,6 +534,7 @@ class EnhancedStrategyEngine:
         """Clean shutdown"""
         logger.info("Shutting down Enhanced Strategy Engine")
         await self.ml_manager.close()
+        await self.redis_client.aclose()
 
 async def main():
     """Service entry point"""
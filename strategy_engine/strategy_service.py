@@ -7,6 +7,7 @@ This replaces the previous `IndicatorStore` with the faster `Calculator` in
 import redis
 import os
 import ast
+import orjson
 import requests
 import uuid
 
@@ -25,6 +26,17 @@ r = redis.from_url(REDIS_URL, decode_responses=True)
 
 calculator = get_calculator()
 
+
+def _decode(data):
+    """Pub/sub payload -> dict: JSON via orjson first, Python-literal reprs as the fallback."""
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        try:
+            return ast.literal_eval(data)
+        except Exception:
+            return None
+
 REWARD_SCALE = float(os.environ.get('REWARD_SCALE', '1.0'))
 LOSS_MULTIPLIER = float(os.environ.get('LOSS_MULTIPLIER', '3.0'))
 
@@ -249,34 +261,19 @@ if __name__ == '__main__':
     while True:
         m = ps.get_message(timeout=0.01)
         if m and m.get('type') == 'message':
-            s = ast.literal_eval(m['data'])
-            decide_and_order(s)
+            s = _decode(m['data'])
+            if s:
+                decide_and_order(s)
 
         t = t_ps.get_message(timeout=0.01)
         if t and t.get('type') == 'message':
-            try:
-                tk = ast.literal_eval(t['data'])
-            except Exception:
-                try:
-                    import json
-
-                    tk = json.loads(t['data'])
-                except Exception:
-                    tk = None
+            tk = _decode(t['data'])
             if tk:
                 # update the fast calculator state for this tick
                 calculator.update(tk)
 
         f = f_ps.get_message(timeout=0.01)
         if f and f.get('type') == 'message':
-            try:
-                fl = ast.literal_eval(f['data'])
-            except Exception:
-                try:
-                    import json
-
-                    fl = json.loads(f['data'])
-                except Exception:
-                    fl = None
+            fl = _decode(f['data'])
             if fl:
                 process_fill(fl)
@@ -0,0 +1,207 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip('onnxruntime')
+onnx = pytest.importorskip('onnx')
+from onnx import TensorProto, helper, numpy_helper
+from fastapi.testclient import TestClient
+
+from pattern_engine import onnx_runner
+
+WINDOW = 8
+
+
+def _write_model(path, batch='batch'):
+    # input [batch,1,W] -> flatten -> matmul [W,2] -> output [batch,2]
+    weights = numpy_helper.from_array(np.arange(WINDOW * 2, dtype=np.float32).reshape(WINDOW, 2), 'w')
+    graph = helper.make_graph(
+        [helper.make_node('Flatten', ['input'], ['flat'], axis=1),
+         helper.make_node('MatMul', ['flat', 'w'], ['output'])],
+        'toy',
+        [helper.make_tensor_value_info('input', TensorProto.FLOAT, [batch, 1, WINDOW])],
+        [helper.make_tensor_value_info('output', TensorProto.FLOAT, [batch, 2])],
+        initializer=[weights],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    path = tmp_path / 'toy.onnx'
+    _write_model(path)
+    monkeypatch.setattr(onnx_runner, 'MODEL_PATH', str(path))
+    monkeypatch.setattr(onnx_runner, '_session', None)
+    monkeypatch.setattr(onnx_runner, '_io', None)
+    monkeypatch.setattr(onnx_runner, '_cpu_session', None)
+    monkeypatch.setattr(onnx_runner, '_status_cache', None)
+    monkeypatch.setattr(onnx_runner, '_SESSIONS', onnx_runner._SessionRegistry())
+    monkeypatch.setattr(onnx_runner, '_BATCHER', onnx_runner._InferBatcher(50, 8))
+    assert onnx_runner.init_onnx_session() is not None
+    return onnx_runner
+
+
+def test_concurrent_infer_requests_share_one_run(runner, monkeypatch):
+    calls = []
+    run = runner._session.run
+
+    class CountingSession:
+        def run(self, names, feeds):
+            calls.append(next(iter(feeds.values())).shape[0])
+            return run(names, feeds)
+
+    runner._SESSIONS.put(runner.MODEL_PATH, CountingSession())
+    results = {}
+    with TestClient(runner.app) as client:
+        def call(i):
+            results[i] = client.post('/infer', json={'window': [float(i)] * WINDOW}).json()
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert sum(calls) == 4 and len(calls) < 4
+    w = np.arange(WINDOW * 2, dtype=np.float32).reshape(WINDOW, 2)
+    for i in range(4):
+        expected = (np.full((1, WINDOW), float(i), dtype=np.float32) @ w).tolist()
+        assert results[i]['probs'] == expected
+
+
+def test_init_runs_every_warmup_shape(runner, monkeypatch):
+    import onnxruntime
+
+    calls = []
+    create = onnxruntime.InferenceSession
+
+    class CountingSession:
+        def __init__(self, *args, **kwargs):
+            self._sess = create(*args, **kwargs)
+
+        def __getattr__(self, name):
+            return getattr(self._sess, name)
+
+        def run(self, names, feeds):
+            calls.append(next(iter(feeds.values())).shape)
+            return self._sess.run(names, feeds)
+
+    monkeypatch.setattr(onnxruntime, 'InferenceSession', CountingSession)
+    monkeypatch.setattr(runner, 'WARMUP_RUNS', 3)
+    monkeypatch.setattr(runner, '_session', None)
+    assert runner.init_onnx_session() is not None
+    assert calls == [(1, 1, WINDOW)] * 3
+
+
+def test_warmup_skips_run_failures_but_raises_bugs(runner, monkeypatch):
+    from onnxruntime.capi.onnxruntime_pybind11_state import Fail
+
+    def fail(sess, arr):
+        raise Fail('bad shape')
+
+    monkeypatch.setattr(runner, '_session_run', fail)
+    runner._warmup()
+    monkeypatch.setattr(runner, '_session_run', lambda arr: None)
+    with pytest.raises(TypeError):
+        runner._warmup()
+
+
+def test_int8_precision_converts_once_and_stays_close(runner, tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, 'PRECISION', 'int8')
+    monkeypatch.setattr(runner, '_session', None)
+    assert runner.init_onnx_session() is not None
+    assert (tmp_path / 'toy.int8.onnx').exists()
+
+    window = np.linspace(0, 1, WINDOW, dtype=np.float32).reshape(1, 1, WINDOW)
+    (out,), _ = runner._run_session(runner._session, window)
+    w = np.arange(WINDOW * 2, dtype=np.float32).reshape(WINDOW, 2)
+    np.testing.assert_allclose(out, window.reshape(1, WINDOW) @ w, rtol=0.05)
+
+
+def test_infer_bin_round_trips_float32_bytes(runner):
+    window = np.linspace(0, 1, WINDOW, dtype=np.float32)
+    with TestClient(runner.app) as client:
+        r = client.post('/infer_bin', content=window.tobytes(),
+                        headers={'Content-Type': 'application/octet-stream'})
+        bad = client.post('/infer_bin', content=b'\x00' * 3)
+    assert r.status_code == 200
+    assert r.headers['X-Output-Shape'] == '1,2'
+    w = np.arange(WINDOW * 2, dtype=np.float32).reshape(WINDOW, 2)
+    np.testing.assert_allclose(np.frombuffer(r.content, dtype='<f4'), window @ w, rtol=1e-6)
+    assert bad.status_code == 400
+
+
+def test_gpu_failures_reuse_one_cpu_fallback_session(runner, monkeypatch):
+    class FailingSession:
+        def run(self, names, feeds):
+            raise RuntimeError('CUDA failure 700: illegal memory access')
+
+    created = []
+    create = runner._create_cpu_fallback
+    monkeypatch.setattr(runner, '_create_cpu_fallback', lambda: created.append(1) or create())
+    window = np.ones((1, 1, WINDOW), dtype=np.float32)
+    for _ in range(3):
+        outs, fallback = runner._run_session(FailingSession(), window)
+        assert fallback == 'cpu'
+    assert len(created) == 1
+
+
+def test_unloaded_session_is_reloaded_on_next_request(runner):
+    with TestClient(runner.app) as client:
+        assert client.post('/model/unload').json() == {'unloaded': True}
+        assert runner._session is None
+        r = client.post('/infer', json={'window': [1.0] * WINDOW})
+    assert r.status_code == 200
+    assert runner._session is not None and runner.MODEL_PATH in runner._SESSIONS.paths()
+
+
+def test_unload_waits_for_in_flight_request(runner):
+    started, finish = threading.Event(), threading.Event()
+    run = runner._session.run
+
+    class BlockingSession:
+        def run(self, names, feeds):
+            started.set()
+            finish.wait(5)
+            return run(names, feeds)
+
+    runner._SESSIONS.put(runner.MODEL_PATH, BlockingSession())
+    result = {}
+    with TestClient(runner.app) as client:
+        t = threading.Thread(target=lambda: result.update(r=client.post('/infer', json={'window': [1.0] * WINDOW})))
+        t.start()
+        assert started.wait(5)
+        assert client.post('/model/unload').status_code == 409
+        finish.set()
+        t.join()
+        assert result['r'].status_code == 200
+        # a request whose session was dropped after its check reloads it
+        assert runner._SESSIONS.drop(runner.MODEL_PATH) and runner._session is not None
+        assert client.post('/infer', json={'window': [1.0] * WINDOW}).status_code == 200
+
+
+def test_registry_sweep_keeps_sessions_in_use():
+    reg = onnx_runner._SessionRegistry()
+    reg.put('a', object())
+    reg.put('b', object())
+    reg.acquire('b')
+    assert reg.sweep(-1) == ['a']
+    assert not reg.drop('b')
+    reg.release('b')
+    assert reg.drop('b') and reg.paths() == []
+
+
+def test_model_status_is_cached_until_unload(runner, monkeypatch):
+    calls = []
+    providers = runner.ort.get_all_providers
+    monkeypatch.setattr(runner.ort, 'get_all_providers', lambda: calls.append(1) or providers())
+    with TestClient(runner.app) as client:
+        first = client.get('/model/status').json()
+        assert client.get('/model/status').json() == first
+        assert len(calls) == 1
+        client.post('/model/unload')
+        assert runner._status_cache is None
+        assert client.get('/model/status').json()['onnx_provider_in_session'] == ['CPUExecutionProvider']
@@ -16,3 +16,130 @@ def test_symbolstate_signal_generation():
     sig2 = s.update_and_detect(101.0, 5000, now + 20)
     # signal may or may not be generated depending on thresholds — ensure no exceptions and type
     assert sig2 is None or isinstance(sig2, dict)
+
+
+def test_tick_batch_is_pipelined_in_one_round_trip():
+    import asyncio
+    import json
+    import orjson
+    from pattern_engine.pattern_detector import _xadd_batch_with_retry
+
+    class FakePipe:
+        def __init__(self, client):
+            self.client = client
+            self.queued = []
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def xadd(self, stream, data, maxlen=None, approximate=True):
+            assert maxlen and approximate
+            # redis-py packs the command here, so later mutation of `data` is harmless
+            self.queued.append((stream, dict(data)))
+
+        async def execute(self):
+            self.client.round_trips += 1
+            return [f"{i}-0" for i in range(len(self.queued))]
+
+    class FakeClient:
+        round_trips = 0
+
+        def __init__(self):
+            self.pipes = []
+
+        def pipeline(self, transaction=True):
+            assert transaction is False
+            self.pipes.append(FakePipe(self))
+            return self.pipes[-1]
+
+    client = FakeClient()
+    entries = [("ticks", orjson.dumps({"symbol": s, "price": 1.0})) for s in ("A", "B", "C")]
+    entries.append(("signals", orjson.dumps({"symbol": "A", "meta": {"vwap": 1.0}})))
+    ids = asyncio.run(_xadd_batch_with_retry(client, entries))
+    assert len(ids) == 4 and client.round_trips == 1
+    queued = client.pipes[0].queued
+    assert all(list(fields) == [b"data"] for _, fields in queued)
+    assert json.loads(queued[0][1][b"data"]) == {"symbol": "A", "price": 1.0}
+    assert json.loads(queued[-1][1][b"data"]) == {"symbol": "A", "meta": {"vwap": 1.0}}
+
+
+def test_state_table_batch_matches_per_symbol_state():
+    import random
+
+    det = PatternDetector(capacity=2)
+    symbols = ["A", "B", "C"]
+    rows = [det.symbol_index(s) for s in symbols]
+    assert rows == [0, 1, 2] and len(det.state) >= 3
+    singles = [det.SymbolState(s) for s in symbols]
+    rng = random.Random(7)
+    prices = [100.0, 50.0, 10.0]
+    fired = 0
+    for t in range(200):
+        prices = [p + rng.gauss(0, p * 0.01) for p in prices]
+        volumes = [rng.choice([0, rng.randint(100, 5000), 20000]) for _ in symbols]
+        got = {s["symbol"]: s for s in det.update_batch(rows, prices, volumes, 1000.0 + t * 40)}
+        for st, price, volume in zip(singles, prices, volumes):
+            want = st.update_and_detect(price, volume, 1000.0 + t * 40)
+            assert (want is None) == (st.symbol not in got)
+            if want:
+                fired += 1
+                assert got[st.symbol]["pattern"] == want["pattern"]
+                assert abs(got[st.symbol]["score"] - want["score"]) < 1e-9
+    assert fired
+
+
+def test_single_xadd_retries_on_the_async_client(monkeypatch):
+    import asyncio
+    from pattern_engine import pattern_detector
+
+    monkeypatch.setattr(pattern_detector.cfg, "redis_retry_delay_seconds", 0)
+
+    class FlakyClient:
+        calls = 0
+
+        async def xadd(self, stream, data, **kwargs):
+            self.calls += 1
+            if self.calls == 1:
+                raise ConnectionError("reset")
+            return "1-0"
+
+    client = FlakyClient()
+    assert asyncio.run(pattern_detector._xadd_with_retry(client, "signals", {"a": 1})) == "1-0"
+    assert client.calls == 2
+
+
+def test_partitions_split_symbols_disjointly():
+    from pattern_engine.pattern_detector import partition_of
+
+    symbols = [f"SYM{i}" for i in range(200)]
+    parts = [partition_of(s, 4) for s in symbols]
+    assert set(parts) == {0, 1, 2, 3}
+    assert parts == [partition_of(s, 4) for s in symbols]
+    assert all(partition_of(s, 1) == 0 for s in symbols)
+
+
+def test_cooldown_runs_on_integer_nanoseconds(monkeypatch):
+    from pattern_engine import pattern_detector
+
+    monkeypatch.setattr(pattern_detector.cfg, "signal_score_min", 0.0)
+    monkeypatch.setattr(pattern_detector.cfg, "signal_cooldown_seconds", 1)
+    s = pattern_detector.PatternDetector.SymbolState("NS")
+    base = 5_000_000_000_000_000_000  # beyond float64's exact integer range
+    fired = [s.update_and_detect(100.0 * 1.1 ** i, 1000, 0.0, ts_ns=base + i * 600_000_000) is not None
+             for i in range(6)]
+    assert fired == [False, True, False, True, False, True]  # first tick scores 0
+    assert s.last_signal_ns == base + 5 * 600_000_000
+
+
+def test_tick_stream_has_its_own_maxlen(monkeypatch):
+    from pattern_engine import pattern_detector as pd
+
+    monkeypatch.setattr(pd.cfg, "stream_maxlen", 10)
+    monkeypatch.setattr(pd.cfg, "ticks_stream_maxlen", 1000)
+    assert pd._xadd_cap(pd.TICKS_STREAM_B) == {"maxlen": 1000, "approximate": True}
+    assert pd._xadd_cap(pd.SIGNALS_STREAM) == {"maxlen": 10, "approximate": True}
+    monkeypatch.setattr(pd.cfg, "ticks_stream_maxlen", 0)
+    assert pd._xadd_cap(pd.TICKS_STREAM) == {}
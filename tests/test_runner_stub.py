@@ -14,3 +14,19 @@ def test_default_model_stub_scaling():
     assert val <= 1.0
     val2 = default_model_stub([-1000.0, -1000.0])
     assert val2 >= -1.0
+
+
+def test_file_replay_matches_row_by_row_replay(tmp_path, monkeypatch):
+    import io
+    import pytest
+    pytest.importorskip('pandas')
+    from pattern_engine.runner import run_replay
+
+    rows = "1,AAA,0.10,10\n2,BBB,-0.5,5\n3,AAA,0.15,0\nbad,row\n4,BBB,-0.49,7\n5,AAA,0.09,3\n"
+    path = tmp_path / 'ticks.csv'
+    path.write_text(rows)
+
+    batched = list(run_replay(str(path)))
+    monkeypatch.setattr('sys.stdin', io.StringIO(rows))
+    assert batched == list(run_replay(None))
+    assert len(batched) == 5 and batched[0].startswith('1,AAA,')
@@ -0,0 +1,183 @@
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+
+
+def load_trt_engine_module():
+    path = Path(__file__).parent.parent / 'pattern_engine' / 'trt_engine.py'
+    spec = importlib.util.spec_from_file_location('pattern_engine.trt_engine', str(path))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class FakeCuda:
+    """Just enough of pycuda.driver: device memory is a dict of numpy arrays and
+    a capturing stream records ops instead of running them."""
+
+    def __init__(self):
+        self.memory = {}
+        self.allocs = 0
+        self.launches = 0
+        cuda = self
+
+        class Alloc:
+            def __init__(self, nbytes):
+                cuda.allocs += 1
+                self.ptr = 0x1000 * cuda.allocs
+                cuda.memory[self.ptr] = np.zeros(nbytes, dtype=np.uint8)
+
+            def __int__(self):
+                return self.ptr
+
+            def free(self):
+                cuda.memory.pop(self.ptr)
+
+        class Graph:
+            def __init__(self, ops):
+                self.ops = ops
+
+            def instantiate(self):
+                return self
+
+            def launch(self, stream):
+                cuda.launches += 1
+                for op in self.ops:
+                    op()
+
+        class Stream:
+            handle = 0
+
+            def __init__(self):
+                self.capturing = None
+
+            def begin_capture(self, *mode):
+                self.capturing = []
+
+            def end_capture(self):
+                ops, self.capturing = self.capturing, None
+                return Graph(ops)
+
+            def run(self, op):
+                if self.capturing is None:
+                    op()
+                else:
+                    self.capturing.append(op)
+
+            def synchronize(self):
+                pass
+
+        self.Stream = Stream
+        self.mem_alloc = Alloc
+        self.pagelocked_empty = np.empty
+
+    def memcpy_htod_async(self, dest, src, stream):
+        def op():
+            self.memory[int(dest)][:src.nbytes] = src.view(np.uint8).ravel()
+        stream.run(op)
+
+    def memcpy_dtoh_async(self, dest, src, stream):
+        def op():
+            dest.view(np.uint8).ravel()[:] = self.memory[int(src)][:dest.nbytes]
+        stream.run(op)
+
+
+def _fake_trt_env(monkeypatch, dynamic=False):
+    """Fake tensorrt/pycuda modules for a 1-input engine computing output = 2 * input
+    ([batch, 4] -> [batch, 4]; batch is -1 in the engine when `dynamic`)."""
+    cuda = FakeCuda()
+
+    class Context:
+        shape = (1, 4)
+
+        def execute_async_v2(self, bindings, handle):
+            n = int(np.prod(self.shape))
+
+            def op():
+                x = cuda.memory[bindings[0]].view(np.float32)[:n]
+                cuda.memory[bindings[1]][:n * 4] = (x * 2).view(np.uint8)
+            stream.run(op)
+
+        def set_binding_shape(self, i, shape):
+            self.shape = shape
+
+        def get_binding_shape(self, i):
+            return self.shape
+
+    class Engine:
+        num_bindings = 2
+
+        def create_execution_context(self):
+            return Context()
+
+        def get_binding_name(self, i):
+            return ('input', 'output')[i]
+
+        def binding_is_input(self, i):
+            return i == 0
+
+        def get_binding_dtype(self, i):
+            return 'float32'
+
+        def get_binding_shape(self, i):
+            return (-1, 4) if dynamic else (1, 4)
+
+    trt = types.ModuleType('tensorrt')
+    trt.Logger = type('Logger', (), {'INFO': 0, 'WARNING': 1, '__init__': lambda self, level: None})
+    trt.Runtime = lambda logger: types.SimpleNamespace(deserialize_cuda_engine=lambda data: Engine())
+    trt.nptype = np.dtype
+    pycuda = types.ModuleType('pycuda')
+    pycuda.autoinit = types.ModuleType('pycuda.autoinit')
+    pycuda.driver = cuda
+    monkeypatch.setitem(sys.modules, 'tensorrt', trt)
+    monkeypatch.setitem(sys.modules, 'pycuda', pycuda)
+    monkeypatch.setitem(sys.modules, 'pycuda.autoinit', pycuda.autoinit)
+    monkeypatch.setitem(sys.modules, 'pycuda.driver', cuda)
+    stream = cuda.Stream()
+    cuda.Stream = lambda: stream
+    return cuda
+
+
+def test_infer_reuses_buffers_and_replays_captured_graph(monkeypatch, tmp_path):
+    cuda = _fake_trt_env(monkeypatch)
+    engine_path = tmp_path / 'toy.engine'
+    engine_path.write_bytes(b'')
+    mod = load_trt_engine_module()
+    eng = mod.TRTEngine(str(engine_path))
+
+    outs = [eng.infer(np.full((1, 4), float(i), dtype=np.float32)) for i in range(3)]
+    for i, out in enumerate(outs):
+        np.testing.assert_array_equal(out, np.full((1, 4), 2.0 * i, dtype=np.float32))
+    # one input + one output allocation for the shape, and calls 2-3 replay the graph
+    assert cuda.allocs == 2 and cuda.launches == 2
+
+
+def test_device_buffers_grow_to_the_largest_shape(monkeypatch, tmp_path):
+    cuda = _fake_trt_env(monkeypatch, dynamic=True)
+    engine_path = tmp_path / 'toy.engine'
+    engine_path.write_bytes(b'')
+    eng = load_trt_engine_module().TRTEngine(str(engine_path))
+
+    for batch in (2, 1, 2, 3, 1):
+        x = np.arange(batch * 4, dtype=np.float32).reshape(batch, 4)
+        np.testing.assert_array_equal(eng.infer(x), x * 2)
+    # batch 2 allocates, batch 1 fits, batch 3 regrows both bindings once
+    assert cuda.allocs == 4
+    assert sorted(cap for _, cap in eng._dev_buf.values()) == [48, 48]
+    assert sorted(buf.size for buf in eng._host_buf.values()) == [12, 12]
+
+
+def test_infer_casts_inputs_into_the_pinned_buffer(monkeypatch, tmp_path):
+    _fake_trt_env(monkeypatch)
+    engine_path = tmp_path / 'toy.engine'
+    engine_path.write_bytes(b'')
+    eng = load_trt_engine_module().TRTEngine(str(engine_path))
+
+    x = np.arange(8, dtype=np.float64).reshape(4, 2).T[:1]  # (1, 4), float64, non-contiguous
+    assert not x.flags.c_contiguous
+    out = eng.infer({'input': x})
+    assert out.dtype == np.float32
+    np.testing.assert_array_equal(out, (x * 2).astype(np.float32))